@@ -11,7 +11,7 @@ const PYTHON_SERVICE_URL =
 export async function POST(request: NextRequest) {
   try {
     const body = await request.json();
-    const { language, code, stdin } = body;
+    const { language, code, stdin, phases, iterations } = body;
 
     if (!language || !code) {
       return NextResponse.json(
@@ -41,6 +41,8 @@ export async function POST(request: NextRequest) {
         language,
         code,
         stdin: stdin || "",
+        phases: phases || false,
+        ...(iterations !== undefined && { iterations }),
       }),
     });
 
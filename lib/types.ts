@@ -52,6 +52,7 @@ export interface RealEnergyMeasurement {
     total_kwh: number;
     total_wh: number;
     total_mj: number;
+    total_j: number; // unrounded joules
     co2_emissions_kg: number;
     co2_emissions_g: number;
   };
@@ -61,6 +62,34 @@ export interface RealEnergyMeasurement {
     ram_energy: string;
   };
   measurement_method: "codecarbon" | "powermonitor" | "system-metrics";
+  power_model?: "rapl" | "tdp-table" | "default";
+  // Present when the measurement was requested with phases: true
+  phases?: MeasurementPhases;
+  iterations?: number;
+}
+
+export interface PhaseMetrics {
+  time_ms: number;
+  cpu_time_ms: number;
+  cpu_percent: number;
+  energy: RealEnergyMeasurement["energy"];
+}
+
+export interface MeasurementPhases {
+  compile: PhaseMetrics | null; // C++ and Java only
+  startup: PhaseMetrics;
+  warmup: PhaseMetrics & { iterations: number };
+  steady_state: PhaseMetrics & {
+    iterations: number;
+    detected: boolean;
+    per_iteration: {
+      time_ms: number;
+      median_time_ms: number;
+      cpu_time_ms: number;
+      energy_j: number;
+    };
+  };
+  shutdown: PhaseMetrics;
 }
 
 export interface MetricData {
@@ -0,0 +1,375 @@
+# python-service/app.py
+"""
+ASGI entry point for the energy measurement service
+- Same HTTP contract as the Flask app in energy_service.py
+- JavaScript/C++/Java programs run as asyncio subprocesses, so one worker supervises many runs
+  without a thread per run; sampling and energy estimation are shared with energy_service
+- CodeCarbon (Python), phase and build-matrix runs block, so they use a small thread pool
+- Model inference and CPU-heavy analysis are offloaded to executors
+"""
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import tempfile
+import sys
+import os
+import time
+import traceback
+
+import energy_service as core
+from power_model import describe_power_model, get_power_model
+from job_queue import JOB_QUEUE_BACKEND, JOB_WAIT_TIMEOUT, POLL_INTERVAL, get_job_queue
+
+# Upper bound on programs running at once in this worker
+MAX_CONCURRENT_RUNS = int(os.environ.get('MAX_CONCURRENT_RUNS', '256'))
+
+# Blocking runners (CodeCarbon, phase harness, build matrix) each hold a thread for the whole run
+BLOCKING_RUN_THREADS = int(os.environ.get('BLOCKING_RUN_THREADS', '32'))
+
+run_executor = ThreadPoolExecutor(max_workers=BLOCKING_RUN_THREADS, thread_name_prefix='run')
+# The model is not safe to call concurrently, so inference gets a single thread
+inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inference')
+analysis_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix='analysis')
+# Job queue calls are short database round trips; kept apart so polling never starves analysis
+queue_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='queue')
+
+run_slots = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+
+async def run_in_executor(executor, func, *args):
+    """Run a blocking call off the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+
+def use_pidfd_child_watcher():
+    """Reap subprocesses via pidfds on the loop instead of a waiter thread per child (Python < 3.12)"""
+    if sys.version_info >= (3, 12) or not hasattr(asyncio, 'PidfdChildWatcher'):
+        return  # 3.12+ already prefers pidfds
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except (AttributeError, OSError):
+        return  # Kernel without pidfd support keeps the default watcher
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(asyncio.get_running_loop())
+    asyncio.set_child_watcher(watcher)
+
+async def run_compiler(command, cwd=None):
+    """Run a compiler as an asyncio subprocess; returns (returncode, stderr, error)"""
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd
+    )
+    try:
+        _, stderr = await asyncio.wait_for(process.communicate(), timeout=core.COMPILE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return None, "", f"Compilation timeout ({core.COMPILE_TIMEOUT}s limit)"
+    finally:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+    return process.returncode, stderr.decode(errors='replace'), None
+
+async def run_monitored_process_async(command, stdin_input="", cwd=None, default_cpu=5.0, default_memory=50.0):
+    """Async counterpart of energy_service.run_monitored_process"""
+    async with run_slots:
+        start_time = time.time()
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd
+        )
+        communicate = asyncio.ensure_future(process.communicate((stdin_input or "").encode()))
+        sampler = core.ProcessSampler(process.pid)
+        sampling = True
+        
+        try:
+            while True:
+                done, _ = await asyncio.wait({communicate}, timeout=core.SAMPLE_INTERVAL)
+                if done:
+                    break
+                if time.time() - start_time >= core.EXECUTION_TIMEOUT:
+                    return None, f"Execution timeout ({core.EXECUTION_TIMEOUT}s limit)"
+                if sampling:
+                    sampling = sampler.sample()
+            stdout, stderr = communicate.result()
+        finally:
+            # Also covers client disconnects, which cancel this coroutine
+            if process.returncode is None:
+                process.kill()
+                await asyncio.shield(communicate)
+        
+        return sampler.run_result(stdout.decode(errors='replace'), stderr.decode(errors='replace'),
+                                  process.returncode, time.time() - start_time,
+                                  default_cpu, default_memory), None
+
+async def measure_monitored_energy_async(language, code, stdin_input=""):
+    """Async counterpart of energy_service.measure_monitored_energy"""
+    profile = core.MONITORED_PROFILES[language]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        compile_command, command = core.build_monitored_commands(language, tmpdir, code)
+        if compile_command:
+            returncode, stderr, error = await run_compiler(compile_command, cwd=tmpdir)
+            if error:
+                return None, error
+            if returncode != 0:
+                return core.compile_error_result(stderr), None
+        
+        run, error = await run_monitored_process_async(command, stdin_input, cwd=tmpdir,
+                                                       default_cpu=profile["default_cpu"],
+                                                       default_memory=profile["default_memory"])
+        if error:
+            return None, error
+        return core.system_metrics_result(run, profile["ram_energy"]), None
+
+async def measure_language_energy(language, code, stdin_input=""):
+    """Measure one run: asyncio supervision where possible, CodeCarbon on the blocking pool"""
+    if language in core.MONITORED_PROFILES:
+        return await measure_monitored_energy_async(language, code, stdin_input)
+    return await run_in_executor(run_executor, core.MEASURE_RUNNERS[language], code, stdin_input)
+
+async def compare_energy_async(language, baseline_code, candidate_code, stdin_input, rounds, alpha):
+    """Async counterpart of energy_service.compare_energy"""
+    samples = core.empty_comparison_samples()
+    for round_index, label, code in core.comparison_schedule(rounds, baseline_code, candidate_code):
+        result, error = await measure_language_energy(language, code, stdin_input)
+        error = core.record_comparison_run(samples, label, round_index, result, error)
+        if error:
+            return None, error
+    
+    return await run_in_executor(analysis_executor, core.summarize_comparison,
+                                 language, rounds, samples, alpha), None
+
+async def submit_to_queue(kind, language, payload):
+    """Enqueue a job for the worker fleet and poll for its result without blocking the loop"""
+    queue = get_job_queue()
+    if not await run_in_executor(queue_executor, queue.has_worker_for, language):
+        return None, f"No measurement worker available for language: {language}"
+    
+    job_id = await run_in_executor(queue_executor, queue.enqueue, kind, language, payload)
+    deadline = time.time() + JOB_WAIT_TIMEOUT
+    try:
+        while time.time() < deadline:
+            outcome = await run_in_executor(queue_executor, queue.collect, job_id)
+            if outcome is not None:
+                return outcome
+            await asyncio.sleep(POLL_INTERVAL)
+    except asyncio.CancelledError:
+        # Client went away; don't leave the job for a worker to pick up (without blocking the loop)
+        queue_executor.submit(queue.cancel, job_id)
+        raise
+    await run_in_executor(queue_executor, queue.cancel, job_id)
+    return None, f"Timed out waiting for a worker ({int(JOB_WAIT_TIMEOUT)}s limit)"
+
+async def dispatch(kind, language, payload):
+    """Async counterpart of energy_service.dispatch"""
+    if core.EXECUTION_MODE == 'queue':
+        return await submit_to_queue(kind, language, payload)
+    if kind == 'measure' and not payload.get("phases"):
+        return await measure_language_energy(language, payload["code"], payload.get("stdin", ""))
+    if kind == 'compare':
+        return await compare_energy_async(language, payload["baseline"], payload["candidate"],
+                                          payload.get("stdin", ""), payload["rounds"], payload["alpha"])
+    # Phase and build-matrix runs block for their whole duration
+    return await run_in_executor(run_executor, core.execute_job, kind, language, payload)
+
+def service_error(prefix, e):
+    """500 response matching the Flask service's error payload"""
+    return JSONResponse({
+        "status": "error",
+        "error": f"{prefix}: {str(e)}",
+        "traceback": traceback.format_exc()
+    }, status_code=500)
+
+async def health_check(request):
+    return JSONResponse({
+        "status": "ok",
+        "service": "multi-language-energy-tracker",
+        "version": "2.1.0",
+        "supported_languages": core.SUPPORTED_LANGUAGES,
+        "ai_optimization": core.HF_AVAILABLE,
+        "model_loaded": 'optimizer' in core.model_cache,
+        "power_model": describe_power_model(),
+        "execution_mode": core.EXECUTION_MODE,
+        "workers": (await run_in_executor(queue_executor, get_job_queue().workers)
+                    if core.EXECUTION_MODE == 'queue' else None)
+    })
+
+async def measure_energy(request):
+    """Execute code and measure real energy consumption"""
+    try:
+        data = await request.json()
+        code = data.get('code', '')
+        language = data.get('language', 'python')
+        stdin_input = data.get('stdin', '')
+        
+        if not code:
+            return JSONResponse({"error": "No code provided"}, status_code=400)
+        
+        if language not in core.MEASURE_RUNNERS:
+            return JSONResponse({
+                "error": f"Unsupported language: {language}",
+                "supported": core.SUPPORTED_LANGUAGES
+            }, status_code=400)
+        
+        params, error = core.parse_phase_params(data)
+        if error:
+            return JSONResponse({"status": "error", "error": error}, status_code=400)
+        
+        result, error = await dispatch('measure', language, dict(params, code=code, stdin=stdin_input))
+        
+        if error:
+            return JSONResponse({"status": "error", "error": error}, status_code=400)
+        
+        return JSONResponse(result)
+    except Exception as e:
+        return service_error("Service error", e)
+
+async def measure_compare(request):
+    """Compare baseline vs candidate code with interleaved runs and a paired t-test"""
+    try:
+        data = await request.json()
+        params, error = core.parse_compare_params(data)
+        if error:
+            return JSONResponse({"status": "error", "error": error}, status_code=400)
+        
+        language, rounds, alpha = params
+        result, error = await dispatch('compare', language, {
+            "baseline": data['baseline'],
+            "candidate": data['candidate'],
+            "stdin": data.get('stdin', ''),
+            "rounds": rounds,
+            "alpha": alpha
+        })
+        
+        if error:
+            return JSONResponse({"status": "error", "error": error}, status_code=400)
+        
+        return JSONResponse(result)
+    except Exception as e:
+        return service_error("Service error", e)
+
+async def measure_matrix(request):
+    """Measure C++/Java code under a matrix of compiler or JVM configurations"""
+    try:
+        data = await request.json()
+        params, error = core.parse_matrix_params(data)
+        if error:
+            return JSONResponse({"status": "error", "error": error}, status_code=400)
+        
+        language, repetitions, configurations = params
+        result, error = await dispatch('matrix', language, {
+            "code": data['code'],
+            "stdin": data.get('stdin', ''),
+            "configurations": configurations,
+            "repetitions": repetitions
+        })
+        if error:
+            return JSONResponse({"status": "error", "error": error}, status_code=400)
+        
+        result["language"] = language
+        return JSONResponse(result)
+    except Exception as e:
+        return service_error("Service error", e)
+
+async def optimize_code(request):
+    """Get AI-powered optimization suggestions"""
+    try:
+        data = await request.json()
+        code = data.get('code', '')
+        language = data.get('language', 'python')
+        hotspots = data.get('hotspots', [])
+        use_ai = data.get('use_ai', False)
+        
+        if not code:
+            return JSONResponse({"error": "No code provided"}, status_code=400)
+        
+        # Use AI model if requested and available
+        if use_ai and core.HF_AVAILABLE:
+            result = await run_in_executor(inference_executor, core.generate_optimization_suggestions,
+                                           code, language, hotspots)
+        else:
+            # Fallback to rule-based suggestions
+            suggestions = await run_in_executor(analysis_executor, core.get_simple_optimization_suggestions,
+                                                language, code, hotspots)
+            result = {
+                "status": "success",
+                "method": "rule-based",
+                "suggestions": suggestions,
+                "ai_available": core.HF_AVAILABLE
+            }
+        
+        return JSONResponse(result)
+    except Exception as e:
+        return service_error("Optimization failed", e)
+
+async def preload_model(request):
+    """Preload AI model for faster subsequent requests"""
+    try:
+        if not core.HF_AVAILABLE:
+            return JSONResponse({
+                "status": "unavailable",
+                "message": "Hugging Face transformers not installed"
+            }, status_code=503)
+        
+        model = await run_in_executor(inference_executor, core.load_optimization_model)
+        if model:
+            return JSONResponse({
+                "status": "success",
+                "model": model['name'],
+                "message": "Model loaded and ready"
+            })
+        else:
+            return JSONResponse({
+                "status": "error",
+                "message": "Model loading failed"
+            }, status_code=500)
+    except Exception as e:
+        return JSONResponse({
+            "status": "error",
+            "error": str(e)
+        }, status_code=500)
+
+@asynccontextmanager
+async def lifespan(app):
+    use_pidfd_child_watcher()
+    # Calibrate (or load the cached power model) before taking traffic
+    await run_in_executor(analysis_executor, get_power_model)
+    yield
+    run_executor.shutdown(wait=False, cancel_futures=True)
+    inference_executor.shutdown(wait=False, cancel_futures=True)
+    analysis_executor.shutdown(wait=False, cancel_futures=True)
+    queue_executor.shutdown(wait=False)
+
+app = Starlette(
+    routes=[
+        Route('/health', health_check, methods=['GET']),
+        Route('/measure', measure_energy, methods=['POST']),
+        Route('/measure/compare', measure_compare, methods=['POST']),
+        Route('/measure/matrix', measure_matrix, methods=['POST']),
+        Route('/optimize', optimize_code, methods=['POST']),
+        Route('/optimize/preload', preload_model, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    
+    print("🔋 Multi-Language Energy Measurement Service (ASGI)")
+    print("=" * 60)
+    print("Starting uvicorn server on http://localhost:5001")
+    print(f"Max concurrent runs per worker: {MAX_CONCURRENT_RUNS} ({BLOCKING_RUN_THREADS} blocking runner threads)")
+    print(f"Execution mode: {core.EXECUTION_MODE}"
+          + (f" ({JOB_QUEUE_BACKEND} job queue)" if core.EXECUTION_MODE == 'queue' else ""))
+    print(f"AI Optimization: {'✅ Enabled' if core.HF_AVAILABLE else '❌ Disabled'}")
+    print("=" * 60)
+    uvicorn.run(app, host='0.0.0.0', port=5001)
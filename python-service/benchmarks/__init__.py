@@ -0,0 +1 @@
+# python-service/benchmarks/__init__.py
@@ -0,0 +1,126 @@
+# python-service/benchmarks/corpus.py
+"""
+Representative programs per language for the benchmark harness
+- trivial: start-up cost only
+- cpu_bound: a few hundred ms of arithmetic
+- alloc_heavy: many small allocations
+- output_heavy: large stdout
+- timeout: never finishes, so the service's execution limit kicks in
+"""
+
+PROGRAMS = {
+    'python': {
+        'trivial': 'print("ok")\n',
+        'cpu_bound': (
+            'total = 0\n'
+            'for i in range(2_000_000):\n'
+            '    total += i * i % 7\n'
+            'print(total)\n'
+        ),
+        'alloc_heavy': (
+            'data = [[i] * 10 for i in range(200_000)]\n'
+            'print(len(data))\n'
+        ),
+        'output_heavy': (
+            'for i in range(50_000):\n'
+            '    print(i)\n'
+        ),
+        'timeout': 'while True:\n    pass\n',
+    },
+    'javascript': {
+        'trivial': 'console.log("ok");\n',
+        'cpu_bound': (
+            'let total = 0;\n'
+            'for (let i = 0; i < 50_000_000; i++) total += (i * i) % 7;\n'
+            'console.log(total);\n'
+        ),
+        'alloc_heavy': (
+            'const data = [];\n'
+            'for (let i = 0; i < 500_000; i++) data.push({ id: i, tags: [i, i + 1] });\n'
+            'console.log(data.length);\n'
+        ),
+        'output_heavy': (
+            'const lines = [];\n'
+            'for (let i = 0; i < 50_000; i++) lines.push(i);\n'
+            'console.log(lines.join("\\n"));\n'
+        ),
+        'timeout': 'while (true) {}\n',
+    },
+    'cpp': {
+        'trivial': '#include <iostream>\nint main() { std::cout << "ok" << std::endl; }\n',
+        'cpu_bound': (
+            '#include <iostream>\n'
+            'int main() {\n'
+            '    long long total = 0;\n'
+            '    for (long long i = 0; i < 200000000LL; i++) total += (i * i) % 7;\n'
+            '    std::cout << total << std::endl;\n'
+            '}\n'
+        ),
+        'alloc_heavy': (
+            '#include <iostream>\n#include <memory>\n#include <vector>\n'
+            'int main() {\n'
+            '    std::vector<std::unique_ptr<std::vector<int>>> data;\n'
+            '    for (int i = 0; i < 500000; i++) data.push_back(std::make_unique<std::vector<int>>(10, i));\n'
+            '    std::cout << data.size() << std::endl;\n'
+            '}\n'
+        ),
+        'output_heavy': (
+            '#include <cstdio>\n'
+            'int main() { for (int i = 0; i < 50000; i++) printf("%d\\n", i); }\n'
+        ),
+        'timeout': 'int main() { volatile int x = 0; while (true) { x++; } }\n',
+    },
+    'java': {
+        'trivial': 'public class Main { public static void main(String[] a) { System.out.println("ok"); } }\n',
+        'cpu_bound': (
+            'public class Main {\n'
+            '    public static void main(String[] a) {\n'
+            '        long total = 0;\n'
+            '        for (long i = 0; i < 200_000_000L; i++) total += (i * i) % 7;\n'
+            '        System.out.println(total);\n'
+            '    }\n'
+            '}\n'
+        ),
+        'alloc_heavy': (
+            'import java.util.*;\n'
+            'public class Main {\n'
+            '    public static void main(String[] a) {\n'
+            '        List<int[]> data = new ArrayList<>();\n'
+            '        for (int i = 0; i < 500_000; i++) data.add(new int[10]);\n'
+            '        System.out.println(data.size());\n'
+            '    }\n'
+            '}\n'
+        ),
+        'output_heavy': (
+            'public class Main {\n'
+            '    public static void main(String[] a) {\n'
+            '        StringBuilder sb = new StringBuilder();\n'
+            '        for (int i = 0; i < 50_000; i++) sb.append(i).append("\\n");\n'
+            '        System.out.print(sb);\n'
+            '    }\n'
+            '}\n'
+        ),
+        'timeout': 'public class Main { public static void main(String[] a) { while (true) {} } }\n',
+    },
+}
+
+# Status each program is expected to produce from /measure
+EXPECTED_STATUS = {
+    'trivial': 200,
+    'cpu_bound': 200,
+    'alloc_heavy': 200,
+    'output_heavy': 200,
+    'timeout': 400,
+}
+
+# Snippets sent to /optimize; they trigger several rule-based suggestions
+OPTIMIZE_SNIPPETS = {
+    'python': 'result = []\nfor i in range(len(arr)):\n    result += [arr[i] * 2]\n',
+    'javascript': 'arr.filter(x => x > 0).map(x => x * 2).forEach(x => out.forEach(y => y(x)));\n',
+    'cpp': 'std::vector<int> v;\nfor (int i = 0; i < n; i++) v.push_back(i);\nint* p = new int[n];\n',
+    'java': 'List<String> l = new ArrayList<>();\nString s = "";\nfor (String x : xs) { l.add(x); s = s + x; }\n',
+}
+
+OPTIMIZE_HOTSPOTS = [
+    {"startLine": 2, "endLine": 3, "score": 0.8, "type": "loop", "suggestion": "Reduce loop work"}
+]
@@ -0,0 +1,412 @@
+# python-service/benchmarks/run.py
+"""
+Load and latency benchmarks for the energy service
+- Drives /measure (corpus programs), /optimize (rule-based and offline stub model) and /health
+- In-process through the Flask test client, or over HTTP against a real local server
+- Reports throughput, p50/p95/p99 latency, error rate and service/worker RSS per scenario
+- Saves results as JSON and compares them with a stored baseline from the same setup
+
+Usage (from python-service/):
+    python -m benchmarks.run --mode client --concurrency 4 --requests 20
+    python -m benchmarks.run --mode server --app asgi --output benchmarks/baseline.json
+    python -m benchmarks.run --mode server --baseline benchmarks/baseline.json
+    python -m benchmarks.run --url http://localhost:5001 --scenarios health,measure
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import psutil
+
+from benchmarks.corpus import EXPECTED_STATUS, OPTIMIZE_HOTSPOTS, OPTIMIZE_SNIPPETS, PROGRAMS
+from worker import detect_languages
+
+SCENARIO_GROUPS = ['health', 'measure', 'optimize']
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results', 'latest.json')
+
+# Results are only comparable with a baseline recorded with the same settings
+COMPARABLE_META = ['mode', 'app', 'concurrency', 'requests', 'warmup', 'stub_latency']
+LOCAL_HOSTS = {'localhost', '127.0.0.1', '::1', socket.gethostname()}
+
+class ClientTransport:
+    """Flask test client, one per thread; RSS is this process's"""
+    
+    def __init__(self, stub_model, stub_latency):
+        import energy_service as core
+        from benchmarks.stub_model import install_stub_model
+        
+        if stub_model:
+            install_stub_model(core, stub_latency)
+        self.app = core.app
+        self.local = threading.local()
+        self.pid = os.getpid()
+    
+    def request(self, method, path, payload=None):
+        if not hasattr(self.local, 'client'):
+            self.local.client = self.app.test_client()
+        response = self.local.client.open(path, method=method, json=payload)
+        return response.status_code, response.get_json(silent=True)
+    
+    def close(self):
+        pass
+
+class HTTPTransport:
+    """Plain HTTP against a running server (launched here unless --url is given)"""
+    
+    def __init__(self, url=None, app='asgi', port=5055, stub_model=False, stub_latency=0.2):
+        self.process = None
+        self.pid = None
+        if url:
+            self.base_url = url.rstrip('/')
+            parsed = urllib.parse.urlparse(self.base_url)
+            if parsed.hostname in LOCAL_HOSTS:
+                self.pid = pid_listening_on(parsed.port or 80)
+            return
+        
+        command = [sys.executable, '-m', 'benchmarks.server', '--app', app, '--port', str(port)]
+        if stub_model:
+            command += ['--stub-model', '--stub-latency', str(stub_latency)]
+        service_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(command, cwd=service_dir,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.pid = self.process.pid
+        self.base_url = f"http://127.0.0.1:{port}"
+        self.wait_until_ready()
+    
+    def wait_until_ready(self, timeout=120):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Service exited during startup (code {self.process.returncode})")
+            try:
+                if self.request('GET', '/health')[0] == 200:
+                    return
+            except OSError:
+                pass
+            time.sleep(0.25)
+        raise RuntimeError("Service did not become healthy in time")
+    
+    def request(self, method, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(req, timeout=300) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        try:
+            return status, json.loads(body)
+        except ValueError:
+            return status, None
+    
+    def close(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+def pid_listening_on(port):
+    """PID of the local process listening on `port`, if this user may see it"""
+    try:
+        for conn in psutil.net_connections(kind='tcp'):
+            if conn.status == psutil.CONN_LISTEN and conn.laddr and conn.laddr.port == port and conn.pid:
+                return conn.pid
+    except psutil.Error:  # macOS needs root to list other processes' sockets
+        pass
+    return None
+
+def local_worker_pids(transport):
+    """Queue-mode workers on this host, from /health: {worker id: pid}"""
+    try:
+        status, body = transport.request('GET', '/health')
+    except OSError:
+        return {}
+    if status != 200 or not isinstance(body, dict):
+        return {}
+    workers = body.get('workers') or []
+    hostname = socket.gethostname()
+    return {worker["id"]: worker["pid"] for worker in workers if worker.get("host") == hostname}
+
+class RSSSampler:
+    """Samples the RSS of the service and its local workers in the background"""
+    
+    def __init__(self, pids, interval=0.1):
+        # pids: {label: pid}, e.g. {"service": 123, "worker:host-456-ab12cd": 456}
+        self.processes = {}
+        for label, pid in pids.items():
+            try:
+                self.processes[label] = psutil.Process(pid)
+            except psutil.Error:
+                pass
+        self.interval = interval
+        self.samples = {label: [] for label in self.processes}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+    
+    def sample(self):
+        while self.processes:
+            for label, process in list(self.processes.items()):
+                try:
+                    self.samples[label].append(process.memory_info().rss / 1024 / 1024)
+                except psutil.Error:
+                    del self.processes[label]
+            if self.stopped.wait(self.interval):
+                return
+    
+    def __enter__(self):
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *_):
+        self.stopped.set()
+        self.thread.join()
+    
+    def summary(self):
+        """{label: {start, peak, end}} for every process that was sampled"""
+        return {label: {
+            "start": round(samples[0], 1),
+            "peak": round(max(samples), 1),
+            "end": round(samples[-1], 1)
+        } for label, samples in self.samples.items() if samples}
+
+def build_scenarios(groups, languages, programs, include_ai):
+    """(name, method, path, payload, expected status) for every selected scenario"""
+    scenarios = []
+    if 'health' in groups:
+        scenarios.append(("health", 'GET', '/health', None, 200))
+    if 'measure' in groups:
+        for language in languages:
+            for program in programs:
+                scenarios.append((f"measure:{language}:{program}", 'POST', '/measure', {
+                    "language": language,
+                    "code": PROGRAMS[language][program],
+                    "stdin": ""
+                }, EXPECTED_STATUS[program]))
+    if 'optimize' in groups:
+        for language in languages:
+            payload = {"language": language, "code": OPTIMIZE_SNIPPETS[language], "hotspots": OPTIMIZE_HOTSPOTS}
+            scenarios.append((f"optimize:rule-based:{language}", 'POST', '/optimize',
+                              dict(payload, use_ai=False), 200))
+            if include_ai:
+                scenarios.append((f"optimize:stub-model:{language}", 'POST', '/optimize',
+                                  dict(payload, use_ai=True), 200))
+    return scenarios
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of pre-sorted values"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def run_scenario(transport, scenario, requests, concurrency, warmup):
+    """Fire `requests` calls at `concurrency`; returns the scenario's metrics"""
+    name, method, path, payload, expected = scenario
+    # The timeout program costs the full execution limit per call, so it runs a single wave
+    if name.endswith(':timeout'):
+        requests, warmup = min(requests, concurrency), 0
+    
+    for _ in range(warmup):
+        transport.request(method, path, payload)
+    
+    def one_call(_):
+        start = time.perf_counter()
+        try:
+            status, body = transport.request(method, path, payload)
+        except OSError as e:
+            return time.perf_counter() - start, False, str(e)
+        ok = status == expected and not (status == 200 and isinstance(body, dict) and body.get('status') == 'error')
+        return time.perf_counter() - start, ok, None if ok else f"HTTP {status}"
+    
+    pids = {"service": transport.pid} if transport.pid else {}
+    pids.update({f"worker:{worker_id}": pid for worker_id, pid in local_worker_pids(transport).items()})
+    with RSSSampler(pids) as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            calls = list(pool.map(one_call, range(requests)))
+        elapsed = time.perf_counter() - started
+    
+    latencies = sorted(latency * 1000 for latency, _, _ in calls)
+    errors = [error for _, ok, error in calls if not ok]
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "error_rate": round(len(errors) / requests, 4),
+        "sample_errors": sorted(set(errors))[:3],
+        "throughput_rps": round(requests / elapsed, 3),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "max": round(latencies[-1], 2)
+        },
+        "rss_mb": rss.summary()
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def baseline_mismatches(meta, baseline_meta):
+    """Settings that differ from the baseline's, as readable strings"""
+    return [f"{key}: {baseline_meta.get(key)!r} in baseline, {meta.get(key)!r} now"
+            for key in COMPARABLE_META
+            if key in baseline_meta and baseline_meta.get(key) != meta.get(key)]
+
+def compare_with_baseline(results, baseline, threshold):
+    """Per-scenario changes vs the baseline; returns (rows, regressions)"""
+    rows, regressions = [], []
+    for name, current in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        
+        def change(new, old):
+            return round((new - old) / old * 100, 1) if old else None
+        
+        row = {
+            "scenario": name,
+            "throughput_pct": change(current["throughput_rps"], previous["throughput_rps"]),
+            "p50_pct": change(current["latency_ms"]["p50"], previous["latency_ms"]["p50"]),
+            "p95_pct": change(current["latency_ms"]["p95"], previous["latency_ms"]["p95"]),
+            "p99_pct": change(current["latency_ms"]["p99"], previous["latency_ms"]["p99"]),
+            "error_rate_delta": round(current["error_rate"] - previous["error_rate"], 4)
+        }
+        rows.append(row)
+        if ((row["p95_pct"] or 0) > threshold or (row["throughput_pct"] or 0) < -threshold
+                or row["error_rate_delta"] > 0):
+            regressions.append(name)
+    return rows, regressions
+
+def print_results(results):
+    print(f"\n{'scenario':<36} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err%':>6} "
+          f"{'rss MB':>8} {'workers MB':>11}")
+    for name, metrics in results["scenarios"].items():
+        latency = metrics["latency_ms"]
+        rss = metrics["rss_mb"]
+        service = rss["service"]["peak"] if "service" in rss else float('nan')
+        worker_peaks = [stats["peak"] for label, stats in rss.items() if label.startswith('worker:')]
+        workers = sum(worker_peaks) if worker_peaks else float('nan')
+        print(f"{name:<36} {metrics['throughput_rps']:>8.2f} {latency['p50']:>9.1f} {latency['p95']:>9.1f} "
+              f"{latency['p99']:>9.1f} {metrics['error_rate'] * 100:>6.1f} {service:>8.1f} {workers:>11.1f}")
+
+def print_comparison(rows, regressions, threshold):
+    print(f"\nvs baseline (regression threshold {threshold}%)")
+    print(f"{'scenario':<36} {'req/s %':>8} {'p50 %':>8} {'p95 %':>8} {'p99 %':>8} {'err Δ':>7}")
+    for row in rows:
+        flag = '  ⚠️' if row["scenario"] in regressions else ''
+        values = [row[key] if row[key] is not None else float('nan')
+                  for key in ("throughput_pct", "p50_pct", "p95_pct", "p99_pct")]
+        print(f"{row['scenario']:<36} {values[0]:>+8.1f} {values[1]:>+8.1f} {values[2]:>+8.1f} "
+              f"{values[3]:>+8.1f} {row['error_rate_delta']:>+7.3f}{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Energy service load and latency benchmarks")
+    parser.add_argument('--mode', choices=['client', 'server'], default='client',
+                        help="client: Flask test client in-process; server: real HTTP server")
+    parser.add_argument('--app', choices=['flask', 'asgi'], default='asgi', help="server mode: which entry point")
+    parser.add_argument('--url', help="benchmark an already running service instead of starting one")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--scenarios', default=','.join(SCENARIO_GROUPS),
+                        help=f"comma-separated groups: {', '.join(SCENARIO_GROUPS)}")
+    parser.add_argument('--languages', default='', help="default: every language with an installed toolchain")
+    parser.add_argument('--programs', default=','.join(EXPECTED_STATUS), help="corpus programs to measure")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=20, help="requests per scenario")
+    parser.add_argument('--warmup', type=int, default=1, help="unrecorded requests per scenario")
+    parser.add_argument('--stub-latency', type=float, default=0.2, help="seconds of CPU per stub inference")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', help="results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument('--allow-mismatch', action='store_true',
+                        help="compare with a baseline recorded with different settings (warns instead of failing)")
+    args = parser.parse_args()
+    
+    groups = [g.strip() for g in args.scenarios.split(',') if g.strip()]
+    languages = [l.strip() for l in args.languages.split(',') if l.strip()] or detect_languages()
+    programs = [p.strip() for p in args.programs.split(',') if p.strip()]
+    unknown = [g for g in groups if g not in SCENARIO_GROUPS] + [p for p in programs if p not in EXPECTED_STATUS]
+    if unknown:
+        parser.error(f"unknown scenario group or program: {', '.join(unknown)}")
+    
+    # The stub model can only be installed in a service this harness controls
+    include_ai = not args.url
+    meta = {
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "mode": 'server' if args.url else args.mode,
+        "app": None if args.url or args.mode == 'client' else args.app,
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "stub_latency": args.stub_latency if include_ai else None,
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+    
+    # Check the baseline before spending minutes on a run that can't be compared
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatches = baseline_mismatches(meta, baseline.get("meta", {}))
+        if mismatches and not args.allow_mismatch:
+            parser.error("baseline was recorded with different settings (pass --allow-mismatch to compare anyway):\n  "
+                         + "\n  ".join(mismatches))
+        for mismatch in mismatches:
+            print(f"⚠️  Baseline settings differ, {mismatch}")
+    
+    if args.mode == 'client' and not args.url:
+        transport = ClientTransport(stub_model=True, stub_latency=args.stub_latency)
+    else:
+        transport = HTTPTransport(args.url, args.app, args.port, stub_model=include_ai,
+                                  stub_latency=args.stub_latency)
+    
+    results = {"meta": meta, "scenarios": {}}
+    
+    try:
+        for scenario in build_scenarios(groups, languages, programs, include_ai):
+            print(f"▶ {scenario[0]}", flush=True)
+            results["scenarios"][scenario[0]] = run_scenario(
+                transport, scenario, args.requests, args.concurrency, args.warmup)
+    finally:
+        transport.close()
+    
+    print_results(results)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results saved to {args.output}")
+    
+    if baseline:
+        rows, regressions = compare_with_baseline(results, baseline, args.threshold)
+        print_comparison(rows, regressions, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} scenario(s) regressed")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+if __name__ == '__main__':
+    main()
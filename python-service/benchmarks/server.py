@@ -0,0 +1,33 @@
+# python-service/benchmarks/server.py
+"""
+Start the service for benchmarking, optionally with the offline stub model
+
+Usage: python -m benchmarks.server --app asgi --port 5055 [--stub-model]
+"""
+
+import argparse
+
+import energy_service as core
+from benchmarks.stub_model import install_stub_model
+
+def main():
+    parser = argparse.ArgumentParser(description="Energy service launcher for benchmarks")
+    parser.add_argument('--app', choices=['flask', 'asgi'], default='asgi')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--stub-model', action='store_true', help="serve use_ai requests with the offline stub")
+    parser.add_argument('--stub-latency', type=float, default=0.2, help="seconds of CPU per stub inference")
+    args = parser.parse_args()
+    
+    if args.stub_model:
+        install_stub_model(core, args.stub_latency)
+    
+    if args.app == 'flask':
+        core.app.run(host='127.0.0.1', port=args.port, threaded=True)
+    else:
+        import uvicorn
+        from app import app
+        
+        uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# python-service/benchmarks/stub_model.py
+"""
+Offline stand-in for the Hugging Face optimizer model
+- Lets /optimize with use_ai=true be benchmarked without transformers/torch or a download
+- Burns CPU for a fixed time per call, like model.generate does
+"""
+
+import time
+
+STUB_MODEL_NAME = "offline-stub"
+
+def install_stub_model(core, latency=0.2):
+    """Patch energy_service so AI optimization uses the stub"""
+    def load_stub_model():
+        core.model_cache['optimizer'] = {'tokenizer': None, 'model': None, 'name': STUB_MODEL_NAME}
+        return core.model_cache['optimizer']
+    
+    def generate_stub_suggestions(code, language, energy_hotspots):
+        load_stub_model()
+        end = time.perf_counter() + latency
+        while time.perf_counter() < end:
+            pass
+        return {
+            "status": "success",
+            "model": STUB_MODEL_NAME,
+            "optimized_code": code[:500],
+            "suggestions": [
+                "Consider algorithm complexity optimization",
+                "Review memory allocation patterns",
+                "Check for unnecessary iterations"
+            ],
+            "confidence": 0.75
+        }
+    
+    core.HF_AVAILABLE = True
+    core.load_optimization_model = load_stub_model
+    core.generate_optimization_suggestions = generate_stub_suggestions
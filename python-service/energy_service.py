@@ -16,6 +16,14 @@ import time
 import traceback
 import psutil
 import platform
+import math
+import re
+import shutil
+import threading
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from power_model import describe_power_model, get_power_model, grid_intensity
+from job_queue import get_job_queue
 
 # Hugging Face imports
 try:
@@ -229,416 +237,214 @@ def get_simple_optimization_suggestions(language, code, hotspots):
     
     return suggestions
 
-# [Keep all the existing measurement functions: estimate_energy_from_metrics, 
-#  measure_javascript_energy, measure_cpp_energy, measure_java_energy, 
-#  measure_python_energy - UNCHANGED]
+# Subprocess limits (seconds)
+EXECUTION_TIMEOUT = 10
+COMPILE_TIMEOUT = 10
+
+# g++ flags used by /measure (on top of -std=c++17)
+DEFAULT_CPP_FLAGS = []
+
+# How often a running program's CPU/memory is sampled (seconds)
+SAMPLE_INTERVAL = 0.05
 
 def estimate_energy_from_metrics(cpu_percent, memory_mb, duration_sec):
-    """Estimate energy consumption from CPU/memory metrics"""
-    cpu_power_watts = (cpu_percent / 100.0) * 65.0
+    """Estimate energy consumption from CPU/memory metrics using the host power model"""
+    model = get_power_model()
+    cpu_power_watts = (cpu_percent / 100.0) * model["cpu_watts"]
     cpu_energy_joules = cpu_power_watts * duration_sec
-    ram_power_watts = (memory_mb / 8192.0) * 3.0
+    ram_power_watts = (memory_mb / 1024.0) * model["ram_watts_per_gb"]
     ram_energy_joules = ram_power_watts * duration_sec
     total_joules = cpu_energy_joules + ram_energy_joules
     total_kwh = total_joules / 3600000.0
     total_wh = total_kwh * 1000
     total_mj = total_joules
-    co2_kg = total_kwh * 0.475
+    co2_kg = total_kwh * grid_intensity()
     
     return {
         "total_kwh": round(total_kwh, 8),
         "total_wh": round(total_wh, 6),
         "total_mj": round(total_mj, 2),
+        "total_j": total_joules,  # Unrounded, for statistics over repeated runs
         "co2_emissions_kg": round(co2_kg, 8),
         "co2_emissions_g": round(co2_kg * 1000, 6)
     }
 
-def measure_javascript_energy(code, stdin_input=""):
-    """Measure JavaScript energy using Node.js and process monitoring"""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-        f.write(code)
-        temp_file = f.name
+class ProcessSampler:
+    """CPU/memory samples of one child process; shared by the sync and asyncio runners"""
     
-    try:
-        start_time = time.time()
-        process = subprocess.Popen(
-            ['node', temp_file],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        ps_process = psutil.Process(process.pid)
-        cpu_samples = []
-        memory_samples = []
-        
+    def __init__(self, pid):
+        self.cpu_samples = []
+        self.memory_samples = []
         try:
-            stdout, stderr = process.communicate(input=stdin_input, timeout=10)
-            try:
-                cpu_percent = ps_process.cpu_percent(interval=0.1)
-                memory_mb = ps_process.memory_info().rss / 1024 / 1024
-                cpu_samples.append(cpu_percent)
-                memory_samples.append(memory_mb)
-            except psutil.NoSuchProcess:
-                cpu_percent = 5.0
-                memory_mb = 50.0
-        except subprocess.TimeoutExpired:
-            process.kill()
-            return None, "Execution timeout (10s limit)"
-        
-        execution_time = time.time() - start_time
-        avg_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else 5.0
-        avg_memory = sum(memory_samples) / len(memory_samples) if memory_samples else 50.0
-        energy = estimate_energy_from_metrics(avg_cpu, avg_memory, execution_time)
-        
+            self.process = psutil.Process(pid)
+            self.process.cpu_percent(interval=None)  # First call only primes the counter
+        except psutil.Error:
+            self.process = None
+    
+    def sample(self):
+        """Record one sample; False once the process has exited"""
+        if self.process is None:
+            return False
+        try:
+            if self.process.status() == psutil.STATUS_ZOMBIE:
+                self.process = None
+                return False
+            cpu_percent = self.process.cpu_percent(interval=None)
+            memory_mb = self.process.memory_info().rss / 1024 / 1024
+        except psutil.Error:
+            self.process = None
+            return False
+        self.cpu_samples.append(cpu_percent)
+        self.memory_samples.append(memory_mb)
+        return True
+    
+    def run_result(self, stdout, stderr, returncode, execution_time, default_cpu, default_memory):
+        """Run record with energy estimated from the samples"""
+        # Programs that finish before the first sample fall back to per-language defaults
+        cpu_samples, memory_samples = self.cpu_samples, self.memory_samples
+        avg_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else default_cpu
+        avg_memory = sum(memory_samples) / len(memory_samples) if memory_samples else default_memory
         return {
-            "status": "success" if process.returncode == 0 else "error",
-            "output": stdout,
-            "error": stderr if process.returncode != 0 else None,
-            "executionTime": round(execution_time * 1000, 2),
-            "energy": energy,
-            "hardware": {
-                "cpu_energy": "estimated from process metrics",
-                "gpu_energy": "not tracked",
-                "ram_energy": "estimated"
-            },
-            "measurement_method": "system-metrics"
-        }, None
-    finally:
-        if os.path.exists(temp_file):
-            os.unlink(temp_file)
+            "stdout": stdout,
+            "stderr": stderr,
+            "returncode": returncode,
+            "execution_time": execution_time,
+            "energy": estimate_energy_from_metrics(avg_cpu, avg_memory, execution_time)
+        }
 
-def measure_cpp_energy(code, stdin_input=""):
-    """Measure C++ energy using g++ and process monitoring"""
-    # Create temp source file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.cpp', delete=False) as f:
-        f.write(code)
-        source_file = f.name
+def run_monitored_process(command, stdin_input="", cwd=None, default_cpu=5.0, default_memory=50.0):
+    """Run a command, sampling its CPU/memory while it runs, and estimate its energy"""
+    start_time = time.time()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd
+    )
+    
+    sampler = ProcessSampler(process.pid)
+    done = threading.Event()
     
-    # Create temp executable
-    executable = tempfile.mktemp(suffix='.exe' if platform.system() == 'Windows' else '')
+    def sample_until_done():
+        while not done.wait(SAMPLE_INTERVAL) and sampler.sample():
+            pass
+    
+    sampling = threading.Thread(target=sample_until_done, daemon=True)
+    sampling.start()
     
     try:
-        # Compile
-        compile_result = subprocess.run(
-            ['g++', source_file, '-o', executable, '-std=c++17'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if compile_result.returncode != 0:
-            return {
-                "status": "error",
-                "error": f"Compilation error: {compile_result.stderr}",
-                "output": "",
-                "executionTime": 0
-            }, None
-        
-        # Execute and monitor
-        start_time = time.time()
-        process = subprocess.Popen(
-            [executable],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        ps_process = psutil.Process(process.pid)
-        cpu_samples = []
-        memory_samples = []
-        
-        try:
-            stdout, stderr = process.communicate(input=stdin_input, timeout=10)
-            
-            try:
-                cpu_percent = ps_process.cpu_percent(interval=0.1)
-                memory_mb = ps_process.memory_info().rss / 1024 / 1024
-                cpu_samples.append(cpu_percent)
-                memory_samples.append(memory_mb)
-            except psutil.NoSuchProcess:
-                cpu_percent = 8.0
-                memory_mb = 10.0
-        
-        except subprocess.TimeoutExpired:
-            process.kill()
-            return None, "Execution timeout (10s limit)"
-        
-        execution_time = time.time() - start_time
-        
-        avg_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else 8.0
-        avg_memory = sum(memory_samples) / len(memory_samples) if memory_samples else 10.0
-        
-        energy = estimate_energy_from_metrics(avg_cpu, avg_memory, execution_time)
-        
-        return {
-            "status": "success" if process.returncode == 0 else "error",
-            "output": stdout,
-            "error": stderr if process.returncode != 0 else None,
-            "executionTime": round(execution_time * 1000, 2),
-            "energy": energy,
-            "hardware": {
-                "cpu_energy": "estimated from process metrics",
-                "gpu_energy": "not tracked",
-                "ram_energy": "estimated"
-            },
-            "measurement_method": "system-metrics"
-        }, None
-        
+        stdout, stderr = process.communicate(input=stdin_input, timeout=EXECUTION_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
+        return None, f"Execution timeout ({EXECUTION_TIMEOUT}s limit)"
     finally:
-        if os.path.exists(source_file):
-            os.unlink(source_file)
-        if os.path.exists(executable):
-            os.unlink(executable)
+        done.set()
+        sampling.join()
+    
+    return sampler.run_result(stdout, stderr, process.returncode, time.time() - start_time,
+                              default_cpu, default_memory), None
 
-def measure_java_energy(code, stdin_input=""):
-    """Measure Java energy using javac/java and process monitoring"""
-    # Create temp source file
+def system_metrics_result(run, ram_energy="estimated"):
+    """Build the /measure response for a process-monitored run"""
+    return {
+        "status": "success" if run["returncode"] == 0 else "error",
+        "output": run["stdout"],
+        "error": run["stderr"] if run["returncode"] != 0 else None,
+        "executionTime": round(run["execution_time"] * 1000, 2),
+        "energy": run["energy"],
+        "hardware": {
+            "cpu_energy": "estimated from process metrics",
+            "gpu_energy": "not tracked",
+            "ram_energy": ram_energy
+        },
+        "power_model": get_power_model()["source"],
+        "measurement_method": "system-metrics"
+    }
+
+def compile_error_result(stderr):
+    """Build the /measure response for a failed compilation"""
+    return {
+        "status": "error",
+        "error": f"Compilation error: {stderr}",
+        "output": "",
+        "executionTime": 0
+    }
+
+# Languages measured by process monitoring: fallback CPU %/memory MB for runs too short to sample
+MONITORED_PROFILES = {
+    'javascript': {"default_cpu": 5.0, "default_memory": 50.0, "ram_energy": "estimated"},
+    'cpp': {"default_cpu": 8.0, "default_memory": 10.0, "ram_energy": "estimated"},
+    # Java has higher memory overhead
+    'java': {"default_cpu": 10.0, "default_memory": 80.0, "ram_energy": "estimated (includes JVM overhead)"},
+}
+
+def cpp_compile_command(source_file, executable, compile_flags=None):
+    """g++ command line for a C++ source file"""
+    flags = compile_flags if compile_flags is not None else DEFAULT_CPP_FLAGS
+    return ['g++', source_file, '-o', executable, '-std=c++17', *flags]
+
+def compile_cpp(source_file, executable, compile_flags=None):
+    """Compile a C++ source file with g++; returns the CompletedProcess"""
+    return subprocess.run(
+        cpp_compile_command(source_file, executable, compile_flags),
+        capture_output=True,
+        text=True,
+        timeout=COMPILE_TIMEOUT
+    )
+
+def build_monitored_commands(language, tmpdir, code):
+    """Write the program; returns (compile command or None, run command), both run in tmpdir"""
+    if language == 'javascript':
+        program = os.path.join(tmpdir, 'main.js')
+        compile_command, command = None, ['node', program]
+    elif language == 'cpp':
+        program = os.path.join(tmpdir, 'main.cpp')
+        executable = os.path.join(tmpdir, 'main.exe' if platform.system() == 'Windows' else 'main')
+        compile_command, command = cpp_compile_command(program, executable), [executable]
+    else:
+        program = os.path.join(tmpdir, 'Main.java')
+        compile_command, command = ['javac', program], ['java', 'Main']
+    
+    with open(program, 'w') as f:
+        f.write(code)
+    return compile_command, command
+
+def measure_monitored_energy(language, code, stdin_input=""):
+    """Compile if needed, run, and estimate energy from process monitoring"""
+    profile = MONITORED_PROFILES[language]
     with tempfile.TemporaryDirectory() as tmpdir:
-        source_file = os.path.join(tmpdir, 'Main.java')
-        with open(source_file, 'w') as f:
-            f.write(code)
-        
-        try:
-            # Compile
-            compile_result = subprocess.run(
-                ['javac', source_file],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                cwd=tmpdir
-            )
-            
-            if compile_result.returncode != 0:
-                return {
-                    "status": "error",
-                    "error": f"Compilation error: {compile_result.stderr}",
-                    "output": "",
-                    "executionTime": 0
-                }, None
-            
-            # Execute and monitor
-            start_time = time.time()
-            process = subprocess.Popen(
-                ['java', 'Main'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=tmpdir
-            )
-            
-            ps_process = psutil.Process(process.pid)
-            cpu_samples = []
-            memory_samples = []
-            
+        compile_command, command = build_monitored_commands(language, tmpdir, code)
+        if compile_command:
             try:
-                stdout, stderr = process.communicate(input=stdin_input, timeout=10)
-                
-                try:
-                    cpu_percent = ps_process.cpu_percent(interval=0.1)
-                    memory_mb = ps_process.memory_info().rss / 1024 / 1024
-                    cpu_samples.append(cpu_percent)
-                    memory_samples.append(memory_mb)
-                except psutil.NoSuchProcess:
-                    cpu_percent = 10.0
-                    memory_mb = 80.0  # Java has higher memory overhead
-            
+                compile_result = subprocess.run(compile_command, capture_output=True, text=True,
+                                                timeout=COMPILE_TIMEOUT, cwd=tmpdir)
             except subprocess.TimeoutExpired:
-                process.kill()
-                return None, "Execution timeout (10s limit)"
-            
-            execution_time = time.time() - start_time
-            
-            avg_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else 10.0
-            avg_memory = sum(memory_samples) / len(memory_samples) if memory_samples else 80.0
-            
-            energy = estimate_energy_from_metrics(avg_cpu, avg_memory, execution_time)
-            
-            return {
-                "status": "success" if process.returncode == 0 else "error",
-                "output": stdout,
-                "error": stderr if process.returncode != 0 else None,
-                "executionTime": round(execution_time * 1000, 2),
-                "energy": energy,
-                "hardware": {
-                    "cpu_energy": "estimated from process metrics",
-                    "gpu_energy": "not tracked",
-                    "ram_energy": "estimated (includes JVM overhead)"
-                },
-                "measurement_method": "system-metrics"
-            }, None
-            
-        except Exception as e:
-            return None, f"Java execution error: {str(e)}"
+                return None, f"Compilation timeout ({COMPILE_TIMEOUT}s limit)"
+            if compile_result.returncode != 0:
+                return compile_error_result(compile_result.stderr), None
         
+        run, error = run_monitored_process(command, stdin_input, cwd=tmpdir,
+                                           default_cpu=profile["default_cpu"],
+                                           default_memory=profile["default_memory"])
+        if error:
+            return None, error
+        return system_metrics_result(run, profile["ram_energy"]), None
+
+def measure_javascript_energy(code, stdin_input=""):
+    """Measure JavaScript energy using Node.js and process monitoring"""
+    return measure_monitored_energy('javascript', code, stdin_input)
+
 def measure_cpp_energy(code, stdin_input=""):
     """Measure C++ energy using g++ and process monitoring"""
-    # Create temp source file
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.cpp', delete=False) as f:
-        f.write(code)
-        source_file = f.name
-    
-    # Create temp executable
-    executable = tempfile.mktemp(suffix='.exe' if platform.system() == 'Windows' else '')
-    
-    try:
-        # Compile
-        compile_result = subprocess.run(
-            ['g++', source_file, '-o', executable, '-std=c++17'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if compile_result.returncode != 0:
-            return {
-                "status": "error",
-                "error": f"Compilation error: {compile_result.stderr}",
-                "output": "",
-                "executionTime": 0
-            }, None
-        
-        # Execute and monitor
-        start_time = time.time()
-        process = subprocess.Popen(
-            [executable],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        ps_process = psutil.Process(process.pid)
-        cpu_samples = []
-        memory_samples = []
-        
-        try:
-            stdout, stderr = process.communicate(input=stdin_input, timeout=10)
-            
-            try:
-                cpu_percent = ps_process.cpu_percent(interval=0.1)
-                memory_mb = ps_process.memory_info().rss / 1024 / 1024
-                cpu_samples.append(cpu_percent)
-                memory_samples.append(memory_mb)
-            except psutil.NoSuchProcess:
-                cpu_percent = 8.0
-                memory_mb = 10.0
-        
-        except subprocess.TimeoutExpired:
-            process.kill()
-            return None, "Execution timeout (10s limit)"
-        
-        execution_time = time.time() - start_time
-        
-        avg_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else 8.0
-        avg_memory = sum(memory_samples) / len(memory_samples) if memory_samples else 10.0
-        
-        energy = estimate_energy_from_metrics(avg_cpu, avg_memory, execution_time)
-        
-        return {
-            "status": "success" if process.returncode == 0 else "error",
-            "output": stdout,
-            "error": stderr if process.returncode != 0 else None,
-            "executionTime": round(execution_time * 1000, 2),
-            "energy": energy,
-            "hardware": {
-                "cpu_energy": "estimated from process metrics",
-                "gpu_energy": "not tracked",
-                "ram_energy": "estimated"
-            },
-            "measurement_method": "system-metrics"
-        }, None
-        
-    finally:
-        if os.path.exists(source_file):
-            os.unlink(source_file)
-        if os.path.exists(executable):
-            os.unlink(executable)
+    return measure_monitored_energy('cpp', code, stdin_input)
 
 def measure_java_energy(code, stdin_input=""):
     """Measure Java energy using javac/java and process monitoring"""
-    # Create temp source file
-    with tempfile.TemporaryDirectory() as tmpdir:
-        source_file = os.path.join(tmpdir, 'Main.java')
-        with open(source_file, 'w') as f:
-            f.write(code)
-        
-        try:
-            # Compile
-            compile_result = subprocess.run(
-                ['javac', source_file],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                cwd=tmpdir
-            )
-            
-            if compile_result.returncode != 0:
-                return {
-                    "status": "error",
-                    "error": f"Compilation error: {compile_result.stderr}",
-                    "output": "",
-                    "executionTime": 0
-                }, None
-            
-            # Execute and monitor
-            start_time = time.time()
-            process = subprocess.Popen(
-                ['java', 'Main'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=tmpdir
-            )
-            
-            ps_process = psutil.Process(process.pid)
-            cpu_samples = []
-            memory_samples = []
-            
-            try:
-                stdout, stderr = process.communicate(input=stdin_input, timeout=10)
-                
-                try:
-                    cpu_percent = ps_process.cpu_percent(interval=0.1)
-                    memory_mb = ps_process.memory_info().rss / 1024 / 1024
-                    cpu_samples.append(cpu_percent)
-                    memory_samples.append(memory_mb)
-                except psutil.NoSuchProcess:
-                    cpu_percent = 10.0
-                    memory_mb = 80.0  # Java has higher memory overhead
-            
-            except subprocess.TimeoutExpired:
-                process.kill()
-                return None, "Execution timeout (10s limit)"
-            
-            execution_time = time.time() - start_time
-            
-            avg_cpu = sum(cpu_samples) / len(cpu_samples) if cpu_samples else 10.0
-            avg_memory = sum(memory_samples) / len(memory_samples) if memory_samples else 80.0
-            
-            energy = estimate_energy_from_metrics(avg_cpu, avg_memory, execution_time)
-            
-            return {
-                "status": "success" if process.returncode == 0 else "error",
-                "output": stdout,
-                "error": stderr if process.returncode != 0 else None,
-                "executionTime": round(execution_time * 1000, 2),
-                "energy": energy,
-                "hardware": {
-                    "cpu_energy": "estimated from process metrics",
-                    "gpu_energy": "not tracked",
-                    "ram_energy": "estimated (includes JVM overhead)"
-                },
-                "measurement_method": "system-metrics"
-            }, None
-            
-        except Exception as e:
-            return None, f"Java execution error: {str(e)}"
-        
+    return measure_monitored_energy('java', code, stdin_input)
+
 def measure_python_energy(code, stdin_input=""):
     """Measure Python energy using CodeCarbon"""
     with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
@@ -655,7 +461,7 @@ def measure_python_energy(code, stdin_input=""):
             input=stdin_input,
             capture_output=True,
             text=True,
-            timeout=10
+            timeout=EXECUTION_TIMEOUT
         )
         
         execution_time = time.time() - start_time
@@ -673,6 +479,7 @@ def measure_python_energy(code, stdin_input=""):
                 "total_kwh": round(energy_kwh, 8),
                 "total_wh": round(energy_wh, 6),
                 "total_mj": round(energy_mj, 2),
+                "total_j": energy_kwh * 3600000.0,
                 "co2_emissions_kg": round(emissions_kg, 8),
                 "co2_emissions_g": round(emissions_kg * 1000, 6)
             },
@@ -685,12 +492,654 @@ def measure_python_energy(code, stdin_input=""):
         }, None
     except subprocess.TimeoutExpired:
         tracker.stop()
-        return None, "Execution timeout (10s limit)"
+        return None, f"Execution timeout ({EXECUTION_TIMEOUT}s limit)"
     finally:
         if os.path.exists(temp_file):
             os.unlink(temp_file)
 
-# [Keep measure_cpp_energy and measure_java_energy functions - UNCHANGED]
+SUPPORTED_LANGUAGES = ["python", "javascript", "cpp", "java"]
+
+MEASURE_RUNNERS = {
+    'python': measure_python_energy,
+    'javascript': measure_javascript_energy,
+    'cpp': measure_cpp_energy,
+    'java': measure_java_energy,
+}
+
+# Phase-segmented measurement settings
+PHASE_DEFAULT_ITERATIONS = 5
+PHASE_MAX_ITERATIONS = 50
+# Iterations whose time is within this fraction of the steady median count as steady state
+STEADY_STATE_TOLERANCE = 0.10
+HARNESS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'harnesses')
+
+def run_phase_process(command, stdin_input="", cwd=None, env=None, timeout=EXECUTION_TIMEOUT):
+    """Run a command and return its exact wall time, CPU time and peak RSS (POSIX wait4)"""
+    with tempfile.TemporaryFile() as stdin_file, \
+            tempfile.TemporaryFile() as stdout_file, \
+            tempfile.TemporaryFile() as stderr_file:
+        stdin_file.write((stdin_input or "").encode())
+        stdin_file.seek(0)
+        
+        launched_ns = time.time_ns()
+        start_time = time.perf_counter()
+        process = subprocess.Popen(command, stdin=stdin_file, stdout=stdout_file,
+                                   stderr=stderr_file, cwd=cwd, env=env)
+        timed_out = threading.Event()
+        
+        def kill_on_timeout():
+            timed_out.set()
+            process.kill()
+        
+        timer = threading.Timer(timeout, kill_on_timeout)
+        timer.start()
+        try:
+            # wait4 reaps this exact child and reports its own resource usage
+            _, wait_status, usage = os.wait4(process.pid, 0)
+        finally:
+            timer.cancel()
+        wall_time = time.perf_counter() - start_time
+        ended_ns = time.time_ns()
+        process.returncode = os.waitstatus_to_exitcode(wait_status)
+        
+        if timed_out.is_set():
+            return None, f"Execution timeout ({timeout}s limit)"
+        
+        stdout_file.seek(0)
+        stderr_file.seek(0)
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        rss_divisor = 1024 * 1024 if platform.system() == 'Darwin' else 1024
+        return {
+            "stdout": stdout_file.read().decode(errors='replace'),
+            "stderr": stderr_file.read().decode(errors='replace'),
+            "returncode": process.returncode,
+            "wall_time": wall_time,
+            "cpu_time": usage.ru_utime + usage.ru_stime,
+            "memory_mb": usage.ru_maxrss / rss_divisor,
+            "launched_ns": launched_ns,
+            "ended_ns": ended_ns
+        }, None
+
+def phase_metrics(wall_time, cpu_time, memory_mb):
+    """Time, CPU and estimated energy for one phase"""
+    wall_time = max(wall_time, 0.0)
+    cpu_time = max(cpu_time, 0.0)
+    cpu_percent = cpu_time / wall_time * 100 if wall_time > 0 else 0.0
+    return {
+        "time_ms": round(wall_time * 1000, 3),
+        "cpu_time_ms": round(cpu_time * 1000, 3),
+        "cpu_percent": round(cpu_percent, 1),
+        "energy": estimate_energy_from_metrics(cpu_percent, memory_mb, wall_time)
+    }
+
+def parse_phase_markers(path):
+    """Read harness markers; returns (ready, [(wall_ns, cpu_ns) per iteration])"""
+    ready = None
+    iterations = []
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if parts[:1] == ['ready'] and len(parts) == 3:
+                    ready = (int(parts[1]), int(parts[2]))
+                elif parts[:1] == ['iter'] and len(parts) == 4:
+                    iterations.append((int(parts[2]), int(parts[3])))
+    except (OSError, ValueError):
+        pass
+    return ready, iterations
+
+def steady_state_start(durations):
+    """Index of the first iteration within tolerance of the steady (tail) median"""
+    if len(durations) < 2:
+        return 0
+    steady_median = statistics.median(durations[len(durations) // 2:])
+    limit = steady_median * (1 + STEADY_STATE_TOLERANCE)
+    return next(i for i, duration in enumerate(durations) if duration <= limit)
+
+def build_phase_commands(language, tmpdir, code):
+    """Write the program and its harness; returns (compile command or None, run command)"""
+    if language == 'python':
+        program = os.path.join(tmpdir, 'main.py')
+        command = [sys.executable, os.path.join(HARNESS_DIR, 'phase_harness.py'), program]
+        compile_command = None
+    elif language == 'javascript':
+        program = os.path.join(tmpdir, 'main.js')
+        command = ['node', os.path.join(HARNESS_DIR, 'phase_harness.js'), program]
+        compile_command = None
+    elif language == 'cpp':
+        program = os.path.join(tmpdir, 'main.cpp')
+        executable = os.path.join(tmpdir, 'main.exe' if platform.system() == 'Windows' else 'main')
+        # The harness wraps the program's own main, which keeps its implicit return 0
+        compile_command = ['g++', program, os.path.join(HARNESS_DIR, 'phase_harness.cpp'), '-o', executable,
+                           '-std=c++17', '-Wl,--wrap=main', *DEFAULT_CPP_FLAGS]
+        command = [executable]
+    else:
+        program = os.path.join(tmpdir, 'Main.java')
+        shutil.copy(os.path.join(HARNESS_DIR, 'PhaseHarness.java'), tmpdir)
+        compile_command = ['javac', program, os.path.join(tmpdir, 'PhaseHarness.java')]
+        command = ['java', '-cp', tmpdir, 'PhaseHarness']
+    
+    with open(program, 'w') as f:
+        f.write(code)
+    return compile_command, command
+
+def measure_phases(language, code, stdin_input="", iterations=PHASE_DEFAULT_ITERATIONS):
+    """Measure compile, runtime startup, warm-up and steady state separately"""
+    if not hasattr(os, 'wait4'):
+        return None, "Phase measurement requires a POSIX host"
+    if language == 'cpp' and platform.system() == 'Darwin':
+        return None, "C++ phase measurement requires GNU ld (-Wl,--wrap), which macOS does not have"
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        compile_command, command = build_phase_commands(language, tmpdir, code)
+        
+        compile_phase = None
+        if compile_command:
+            build, error = run_phase_process(compile_command, cwd=tmpdir, timeout=COMPILE_TIMEOUT)
+            if error:
+                return None, error.replace("Execution", "Compilation")
+            if build["returncode"] != 0:
+                return compile_error_result(build["stderr"]), None
+            compile_phase = phase_metrics(build["wall_time"], build["cpu_time"], build["memory_mb"])
+        
+        marker_file = os.path.join(tmpdir, 'phases.log')
+        stdin_file = os.path.join(tmpdir, 'stdin.txt')
+        with open(stdin_file, 'w') as f:
+            f.write(stdin_input or "")
+        env = dict(os.environ,
+                   PHASE_MARKER_FILE=marker_file,
+                   PHASE_STDIN_FILE=stdin_file,
+                   PHASE_ITERATIONS=str(iterations),
+                   # Stop repeating halfway through the limit so the run itself can't time out
+                   PHASE_BUDGET_MS=str(EXECUTION_TIMEOUT * 1000 // 2))
+        run, error = run_phase_process(command, stdin_input, cwd=tmpdir, env=env)
+        if error:
+            return None, error
+        ready, marks = parse_phase_markers(marker_file)
+    
+    if run["returncode"] != 0:
+        error = run["stderr"] or f"Exited with code {run['returncode']}"
+    elif not ready:
+        error = "Harness did not start"
+    elif not marks:
+        # exit(), process.exit(), System.exit() or os._exit() end the process mid-run
+        error = "Program exited before its first run completed, so no phases could be measured"
+    else:
+        error = None
+    
+    memory_mb = run["memory_mb"]
+    result = {
+        "status": "error" if error else "success",
+        "output": run["stdout"],
+        "error": error,
+        "executionTime": round(run["wall_time"] * 1000, 2),
+        "energy": phase_metrics(run["wall_time"], run["cpu_time"], memory_mb)["energy"],
+        "hardware": {
+            "cpu_energy": "estimated from process CPU time per phase",
+            "gpu_energy": "not tracked",
+            "ram_energy": "estimated from peak RSS"
+        },
+        "power_model": get_power_model()["source"],
+        "measurement_method": "system-metrics"
+    }
+    if error:
+        return result, None
+    
+    # Per-iteration wall/CPU deltas between consecutive markers
+    boundaries = [ready] + marks
+    deltas = [((end[0] - start[0]) / 1e9, (end[1] - start[1]) / 1e9)
+              for start, end in zip(boundaries, boundaries[1:])]
+    steady_from = steady_state_start([wall for wall, _ in deltas])
+    warmup, steady = deltas[:steady_from], deltas[steady_from:]
+    last_wall_ns, last_cpu_ns = boundaries[-1]
+    
+    def combined(runs):
+        return phase_metrics(sum(w for w, _ in runs), sum(c for _, c in runs), memory_mb)
+    
+    # At least one iteration finished, so steady state always has a run to describe
+    steady_phase = combined(steady)
+    steady_phase.update({
+        "iterations": len(steady),
+        "detected": len(steady) >= 2,
+        "per_iteration": {
+            "time_ms": round(statistics.mean(w for w, _ in steady) * 1000, 3),
+            "median_time_ms": round(statistics.median(w for w, _ in steady) * 1000, 3),
+            "cpu_time_ms": round(statistics.mean(c for _, c in steady) * 1000, 3),
+            "energy_j": round(steady_phase["energy"]["total_j"] / len(steady), 6)
+        }
+    })
+    
+    result["phases"] = {
+        "compile": compile_phase,
+        "startup": phase_metrics((ready[0] - run["launched_ns"]) / 1e9, ready[1] / 1e9, memory_mb),
+        "warmup": dict(combined(warmup), iterations=len(warmup)),
+        "steady_state": steady_phase,
+        "shutdown": phase_metrics((run["ended_ns"] - last_wall_ns) / 1e9,
+                                  run["cpu_time"] - last_cpu_ns / 1e9, memory_mb)
+    }
+    result["iterations"] = len(deltas)
+    return result, None
+
+# A/B comparison settings (each run can take up to the 10s execution limit)
+COMPARE_DEFAULT_ROUNDS = 5
+COMPARE_MAX_ROUNDS = 20
+COMPARE_DEFAULT_ALPHA = 0.05
+
+def _incomplete_beta_cf(a, b, x):
+    """Continued fraction for the regularized incomplete beta (Lentz's method)"""
+    tiny = 1e-30
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 200):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+def _incomplete_beta(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                 + a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return math.exp(log_front) * _incomplete_beta_cf(a, b, x) / a
+    return 1.0 - math.exp(log_front) * _incomplete_beta_cf(b, a, 1.0 - x) / b
+
+def student_t_p_value(t_stat, df):
+    """Two-sided p-value for a Student's t statistic"""
+    return _incomplete_beta(df / 2.0, 0.5, df / (df + t_stat * t_stat))
+
+def student_t_critical(alpha, df):
+    """Two-sided critical t value for significance level alpha (bisection)"""
+    low, high = 0.0, 1e4
+    for _ in range(200):
+        mid = (low + high) / 2.0
+        if student_t_p_value(mid, df) > alpha:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2.0
+
+def paired_difference_stats(baseline, candidate, alpha=COMPARE_DEFAULT_ALPHA):
+    """Paired t-test of candidate - baseline with a (1 - alpha) confidence interval"""
+    deltas = [c - b for b, c in zip(baseline, candidate)]
+    n = len(deltas)
+    mean_delta = statistics.mean(deltas)
+    stdev_delta = statistics.stdev(deltas) if n > 1 else 0.0
+    std_error = stdev_delta / math.sqrt(n)
+    baseline_mean = statistics.mean(baseline)
+    
+    # Spread below this is float noise, not measurement variation
+    resolution = 1e-9 * max(abs(baseline_mean), abs(mean_delta))
+    if std_error <= resolution:
+        # Every round moved by the same amount: a real shift unless that amount is zero
+        p_value = 1.0 if abs(mean_delta) <= resolution else 0.0
+        half_width = 0.0
+    else:
+        p_value = student_t_p_value(mean_delta / std_error, n - 1)
+        half_width = student_t_critical(alpha, n - 1) * std_error
+    
+    relative_change = (mean_delta / baseline_mean * 100) if baseline_mean else None
+    
+    return {
+        "baseline_mean": round(baseline_mean, 6),
+        "candidate_mean": round(statistics.mean(candidate), 6),
+        "mean_delta": round(mean_delta, 6),
+        "stdev_delta": round(stdev_delta, 6),
+        "relative_change_pct": round(relative_change, 2) if relative_change is not None else None,
+        "confidence_interval": [round(mean_delta - half_width, 6), round(mean_delta + half_width, 6)],
+        "confidence_level": round(1 - alpha, 4),
+        "p_value": round(p_value, 6),
+        "significant": p_value < alpha
+    }
+
+def comparison_verdict(stats):
+    """Turn paired statistics into a verdict (lower is better)"""
+    if not stats["significant"]:
+        return "no_significant_difference"
+    return "candidate_better" if stats["mean_delta"] < 0 else "candidate_worse"
+
+def comparison_schedule(rounds, baseline_code, candidate_code):
+    """Interleaved (round index, label, code) runs: baseline, candidate, baseline, ..."""
+    for round_index in range(rounds):
+        for label, code in (("baseline", baseline_code), ("candidate", candidate_code)):
+            yield round_index, label, code
+
+def empty_comparison_samples():
+    return {
+        "baseline": {"time_ms": [], "energy_j": []},
+        "candidate": {"time_ms": [], "energy_j": []}
+    }
+
+def record_comparison_run(samples, label, round_index, result, error):
+    """Add one run to `samples`; returns an error message if the run failed"""
+    if not error and result["status"] != "success":
+        error = result.get('error')
+    if error:
+        return f"{label} run {round_index + 1} failed: {error}"
+    samples[label]["time_ms"].append(result["executionTime"])
+    samples[label]["energy_j"].append(result["energy"]["total_j"])
+    return None
+
+def compare_energy(language, baseline_code, candidate_code, stdin_input="",
+                   rounds=COMPARE_DEFAULT_ROUNDS, alpha=COMPARE_DEFAULT_ALPHA):
+    """Run baseline and candidate interleaved (ABAB...) and compare paired deltas"""
+    runner = MEASURE_RUNNERS[language]
+    samples = empty_comparison_samples()
+    
+    for round_index, label, code in comparison_schedule(rounds, baseline_code, candidate_code):
+        result, error = runner(code, stdin_input)
+        error = record_comparison_run(samples, label, round_index, result, error)
+        if error:
+            return None, error
+    
+    return summarize_comparison(language, rounds, samples, alpha), None
+
+def summarize_comparison(language, rounds, samples, alpha):
+    """Paired statistics and verdicts for collected baseline/candidate samples"""
+    time_stats = paired_difference_stats(
+        samples["baseline"]["time_ms"], samples["candidate"]["time_ms"], alpha)
+    energy_stats = paired_difference_stats(
+        samples["baseline"]["energy_j"], samples["candidate"]["energy_j"], alpha)
+    
+    return {
+        "status": "success",
+        "language": language,
+        "rounds": rounds,
+        "order": "interleaved (ABAB...)",
+        "test": "paired t-test",
+        "executionTime": time_stats,
+        "energy": energy_stats,
+        "verdict": {
+            "energy": comparison_verdict(energy_stats),
+            "executionTime": comparison_verdict(time_stats)
+        },
+        "samples": samples
+    }
+
+def parse_compare_params(data):
+    """Validate /measure/compare options; returns ((language, rounds, alpha), error)"""
+    language = data.get('language', 'python')
+    if not data.get('baseline') or not data.get('candidate'):
+        return None, "Both baseline and candidate code are required"
+    if language not in MEASURE_RUNNERS:
+        return None, f"Unsupported language: {language}"
+    
+    try:
+        rounds = int(data.get('rounds', COMPARE_DEFAULT_ROUNDS))
+        alpha = float(data.get('alpha', COMPARE_DEFAULT_ALPHA))
+    except (TypeError, ValueError):
+        return None, "rounds must be an integer and alpha a number"
+    
+    if not 2 <= rounds <= COMPARE_MAX_ROUNDS:
+        return None, f"rounds must be between 2 and {COMPARE_MAX_ROUNDS}"
+    if not 0 < alpha < 1:
+        return None, "alpha must be between 0 and 1"
+    return (language, rounds, alpha), None
+
+# Build-configuration matrix settings
+MATRIX_DEFAULT_REPETITIONS = 3
+MATRIX_MAX_REPETITIONS = 10
+MATRIX_MAX_CONFIGURATIONS = 8
+
+MATRIX_PRESETS = {
+    'cpp': [
+        {"name": "O0", "flags": ["-O0"]},
+        {"name": "O2", "flags": ["-O2"]},
+        {"name": "O3", "flags": ["-O3"]},
+        {"name": "O3-native", "flags": ["-O3", "-march=native"]}
+    ],
+    'java': [
+        {"name": "default", "flags": []},
+        {"name": "c1-only", "flags": ["-XX:TieredStopAtLevel=1"]},
+        {"name": "serial-gc", "flags": ["-XX:+UseSerialGC"]},
+        {"name": "parallel-gc", "flags": ["-XX:+UseParallelGC"]},
+        {"name": "small-heap", "flags": ["-Xms64m", "-Xmx256m"]}
+    ]
+}
+
+# Flags are passed straight to g++/java, so only known-safe options are accepted
+MATRIX_ALLOWED_FLAGS = {
+    'cpp': re.compile(
+        r"^(-O[0-3sgz]|-Ofast|-march=native|-mtune=native|-flto|-funroll-loops"
+        r"|-ffast-math|-fno-exceptions|-fno-rtti|-std=c\+\+(11|14|17|20)|-DNDEBUG)$"
+    ),
+    'java': re.compile(
+        r"^(-Xm[sx]\d+[kKmMgG]?|-Xss\d+[kKmM]?|-Xint|-XX:TieredStopAtLevel=[0-4]"
+        r"|-XX:[+-]TieredCompilation|-XX:\+Use(Serial|Parallel|G1|Z|Shenandoah)GC)$"
+    )
+}
+
+def validate_matrix_configurations(language, configurations):
+    """Check user-supplied matrix configurations; returns (configurations, error)"""
+    if configurations is None:
+        return MATRIX_PRESETS[language], None
+    if not isinstance(configurations, list) or not configurations:
+        return None, "configurations must be a non-empty list"
+    if len(configurations) > MATRIX_MAX_CONFIGURATIONS:
+        return None, f"At most {MATRIX_MAX_CONFIGURATIONS} configurations are allowed"
+    
+    validated = []
+    for config in configurations:
+        flags = config.get('flags', []) if isinstance(config, dict) else None
+        if not isinstance(flags, list) or not all(isinstance(flag, str) for flag in flags):
+            return None, "Each configuration needs a list of string flags"
+        rejected = [flag for flag in flags if not MATRIX_ALLOWED_FLAGS[language].match(flag)]
+        if rejected:
+            return None, f"Unsupported {language} flags: {', '.join(rejected)}"
+        validated.append({
+            "name": str(config.get('name') or ' '.join(flags) or 'default'),
+            "flags": flags
+        })
+    return validated, None
+
+def parse_matrix_params(data):
+    """Validate /measure/matrix options; returns ((language, repetitions, configurations), error)"""
+    language = data.get('language', 'cpp')
+    if not data.get('code'):
+        return None, "No code provided"
+    if language not in MATRIX_RUNNERS:
+        return None, (f"Build matrix not supported for language: {language} "
+                      f"(supported: {', '.join(MATRIX_RUNNERS)})")
+    
+    try:
+        repetitions = int(data.get('repetitions', MATRIX_DEFAULT_REPETITIONS))
+    except (TypeError, ValueError):
+        return None, "repetitions must be an integer"
+    if not 1 <= repetitions <= MATRIX_MAX_REPETITIONS:
+        return None, f"repetitions must be between 1 and {MATRIX_MAX_REPETITIONS}"
+    
+    configurations, error = validate_matrix_configurations(language, data.get('configurations'))
+    if error:
+        return None, error
+    return (language, repetitions, configurations), None
+
+def summarize_samples(values):
+    """Mean/median/stdev/min summary of repeated measurements"""
+    return {
+        "mean": round(statistics.mean(values), 6),
+        "median": round(statistics.median(values), 6),
+        "stdev": round(statistics.stdev(values), 6) if len(values) > 1 else 0.0,
+        "min": round(min(values), 6)
+    }
+
+def measure_variants(configurations, builds, stdin_input, repetitions, cwd=None,
+                     default_cpu=5.0, default_memory=50.0):
+    """Run every built variant round-robin and tabulate time/energy per configuration"""
+    samples = [{"time_ms": [], "energy_j": []} for _ in configurations]
+    errors = {i: build["error"] for i, build in enumerate(builds) if build["error"]}
+    runnable = [i for i in range(len(configurations)) if i not in errors]
+    
+    for repetition in range(repetitions):
+        # Rotate the starting variant so no configuration always runs first
+        offset = repetition % len(runnable) if runnable else 0
+        for i in runnable[offset:] + runnable[:offset]:
+            if i in errors:
+                continue
+            run, error = run_monitored_process(builds[i]["command"], stdin_input, cwd=cwd,
+                                               default_cpu=default_cpu, default_memory=default_memory)
+            if error or run["returncode"] != 0:
+                errors[i] = error or run["stderr"] or f"Exited with code {run['returncode']}"
+                continue
+            samples[i]["time_ms"].append(run["execution_time"] * 1000)
+            samples[i]["energy_j"].append(run["energy"]["total_j"])
+    
+    reference = next((i for i in range(len(configurations)) if i not in errors), None)
+    rows = []
+    for i, config in enumerate(configurations):
+        row = {
+            "name": config["name"],
+            "flags": config["flags"],
+            "compile_time_ms": builds[i]["compile_time_ms"]
+        }
+        if i in errors:
+            row.update({"status": "error", "error": errors[i]})
+        else:
+            time_summary = summarize_samples(samples[i]["time_ms"])
+            energy_summary = summarize_samples(samples[i]["energy_j"])
+            row.update({
+                "status": "success",
+                "runs": len(samples[i]["time_ms"]),
+                "executionTime": time_summary,
+                "energy_j": energy_summary
+            })
+            if reference is not None and i != reference:
+                ref_time = statistics.mean(samples[reference]["time_ms"])
+                ref_energy = statistics.mean(samples[reference]["energy_j"])
+                row["vs_reference"] = {
+                    "time_change_pct": round((time_summary["mean"] - ref_time) / ref_time * 100, 2) if ref_time else None,
+                    "energy_change_pct": round((energy_summary["mean"] - ref_energy) / ref_energy * 100, 2) if ref_energy else None
+                }
+        rows.append(row)
+    
+    return {
+        "status": "success",
+        "repetitions": repetitions,
+        "reference": configurations[reference]["name"] if reference is not None else None,
+        "configurations": rows,
+        "measurement_method": "system-metrics"
+    }
+
+def measure_cpp_matrix(code, stdin_input, configurations, repetitions):
+    """Compile C++ under each configuration in parallel, then measure every variant"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source_file = os.path.join(tmpdir, 'main.cpp')
+        with open(source_file, 'w') as f:
+            f.write(code)
+        suffix = '.exe' if platform.system() == 'Windows' else ''
+        
+        def build(index):
+            executable = os.path.join(tmpdir, f"variant_{index}{suffix}")
+            start_time = time.time()
+            try:
+                result = compile_cpp(source_file, executable, configurations[index]["flags"])
+            except subprocess.TimeoutExpired:
+                return {"command": None, "compile_time_ms": None,
+                        "error": f"Compilation timeout ({COMPILE_TIMEOUT}s limit)"}
+            return {
+                "command": [executable],
+                "compile_time_ms": round((time.time() - start_time) * 1000, 2),
+                "error": f"Compilation error: {result.stderr}" if result.returncode != 0 else None
+            }
+        
+        workers = min(len(configurations), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            builds = list(pool.map(build, range(len(configurations))))
+        
+        return measure_variants(configurations, builds, stdin_input, repetitions,
+                                default_cpu=8.0, default_memory=10.0)
+
+def measure_java_matrix(code, stdin_input, configurations, repetitions):
+    """Compile Java once, then measure the program under each set of JVM flags"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source_file = os.path.join(tmpdir, 'Main.java')
+        with open(source_file, 'w') as f:
+            f.write(code)
+        
+        start_time = time.time()
+        try:
+            compile_result = subprocess.run(
+                ['javac', source_file],
+                capture_output=True,
+                text=True,
+                timeout=COMPILE_TIMEOUT,
+                cwd=tmpdir
+            )
+            compile_time_ms = round((time.time() - start_time) * 1000, 2)
+            error = f"Compilation error: {compile_result.stderr}" if compile_result.returncode != 0 else None
+        except subprocess.TimeoutExpired:
+            compile_time_ms = None
+            error = f"Compilation timeout ({COMPILE_TIMEOUT}s limit)"
+        
+        # JVM flags are runtime options, so every configuration shares one build
+        builds = [{
+            "command": ['java', *config["flags"], 'Main'],
+            "compile_time_ms": compile_time_ms,
+            "error": error
+        } for config in configurations]
+        
+        return measure_variants(configurations, builds, stdin_input, repetitions,
+                                cwd=tmpdir, default_cpu=10.0, default_memory=80.0)
+
+MATRIX_RUNNERS = {
+    'cpp': measure_cpp_matrix,
+    'java': measure_java_matrix,
+}
+
+# "local" runs programs in this process; "queue" hands them to worker.py processes
+EXECUTION_MODE = os.environ.get('EXECUTION_MODE', 'local')
+
+def execute_job(kind, language, payload):
+    """Run a measure/compare/matrix job in-process; returns (result, error)"""
+    stdin_input = payload.get('stdin', '')
+    if kind == 'measure':
+        if payload.get('phases'):
+            return measure_phases(language, payload['code'], stdin_input, payload['iterations'])
+        return MEASURE_RUNNERS[language](payload['code'], stdin_input)
+    if kind == 'compare':
+        return compare_energy(language, payload['baseline'], payload['candidate'], stdin_input,
+                              payload['rounds'], payload['alpha'])
+    if kind == 'matrix':
+        return MATRIX_RUNNERS[language](payload['code'], stdin_input,
+                                        payload['configurations'], payload['repetitions']), None
+    return None, f"Unknown job kind: {kind}"
+
+def parse_phase_params(data):
+    """Validate the /measure phase options; returns ({phases, iterations}, error)"""
+    if not data.get('phases'):
+        return {"phases": False, "iterations": None}, None
+    try:
+        iterations = int(data.get('iterations', PHASE_DEFAULT_ITERATIONS))
+    except (TypeError, ValueError):
+        return None, "iterations must be an integer"
+    if not 1 <= iterations <= PHASE_MAX_ITERATIONS:
+        return None, f"iterations must be between 1 and {PHASE_MAX_ITERATIONS}"
+    return {"phases": True, "iterations": iterations}, None
+
+def dispatch(kind, language, payload):
+    """Run a job locally, or enqueue it for the worker fleet and wait in queue mode"""
+    if EXECUTION_MODE == 'queue':
+        return get_job_queue().submit(kind, language, payload)
+    return execute_job(kind, language, payload)
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -698,9 +1147,12 @@ def health_check():
         "status": "ok",
         "service": "multi-language-energy-tracker",
         "version": "2.1.0",
-        "supported_languages": ["python", "javascript", "cpp", "java"],
+        "supported_languages": SUPPORTED_LANGUAGES,
         "ai_optimization": HF_AVAILABLE,
-        "model_loaded": 'optimizer' in model_cache
+        "model_loaded": 'optimizer' in model_cache,
+        "power_model": describe_power_model(),
+        "execution_mode": EXECUTION_MODE,
+        "workers": get_job_queue().workers() if EXECUTION_MODE == 'queue' else None
     })
 
 @app.route('/measure', methods=['POST'])
@@ -715,23 +1167,78 @@ def measure_energy():
         if not code:
             return jsonify({"error": "No code provided"}), 400
         
-        if language == 'python':
-            result, error = measure_python_energy(code, stdin_input)
-        elif language == 'javascript':
-            result, error = measure_javascript_energy(code, stdin_input)
-        elif language == 'cpp':
-            result, error = measure_cpp_energy(code, stdin_input)
-        elif language == 'java':
-            result, error = measure_java_energy(code, stdin_input)
-        else:
+        if language not in MEASURE_RUNNERS:
             return jsonify({
                 "error": f"Unsupported language: {language}",
-                "supported": ["python", "javascript", "cpp", "java"]
+                "supported": SUPPORTED_LANGUAGES
             }), 400
         
+        params, error = parse_phase_params(data)
+        if error:
+            return jsonify({"status": "error", "error": error}), 400
+        
+        result, error = dispatch('measure', language, dict(params, code=code, stdin=stdin_input))
+        
+        if error:
+            return jsonify({"status": "error", "error": error}), 400
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Service error: {str(e)}",
+            "traceback": traceback.format_exc()
+        }), 500
+
+@app.route('/measure/compare', methods=['POST'])
+def measure_compare():
+    """Compare baseline vs candidate code with interleaved runs and a paired t-test"""
+    try:
+        data = request.json
+        params, error = parse_compare_params(data)
+        if error:
+            return jsonify({"status": "error", "error": error}), 400
+        
+        language, rounds, alpha = params
+        result, error = dispatch('compare', language, {
+            "baseline": data['baseline'],
+            "candidate": data['candidate'],
+            "stdin": data.get('stdin', ''),
+            "rounds": rounds,
+            "alpha": alpha
+        })
+        
+        if error:
+            return jsonify({"status": "error", "error": error}), 400
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "error": f"Service error: {str(e)}",
+            "traceback": traceback.format_exc()
+        }), 500
+
+@app.route('/measure/matrix', methods=['POST'])
+def measure_matrix():
+    """Measure C++/Java code under a matrix of compiler or JVM configurations"""
+    try:
+        data = request.json
+        params, error = parse_matrix_params(data)
+        if error:
+            return jsonify({"status": "error", "error": error}), 400
+        
+        language, repetitions, configurations = params
+        result, error = dispatch('matrix', language, {
+            "code": data['code'],
+            "stdin": data.get('stdin', ''),
+            "configurations": configurations,
+            "repetitions": repetitions
+        })
         if error:
             return jsonify({"status": "error", "error": error}), 400
         
+        result["language"] = language
         return jsonify(result)
     except Exception as e:
         return jsonify({
@@ -809,4 +1316,5 @@ if __name__ == '__main__':
     print("Supported Languages: Python, JavaScript, C++, Java")
     print(f"AI Optimization: {'✅ Enabled' if HF_AVAILABLE else '❌ Disabled'}")
     print("=" * 60)
+    get_power_model()
     app.run(host='0.0.0.0', port=5001, debug=True)
\ No newline at end of file
@@ -0,0 +1,66 @@
+// python-service/harnesses/phase_harness.cpp
+// Runs a C++ program's main repeatedly in one process and records phase markers.
+// "ready" once the process is up (after static initialisation), "iter N" after each run.
+// Only the first run's stdout is kept. The program is linked unchanged with
+// -Wl,--wrap=main: the C runtime calls __wrap_main below, and __real_main is the
+// program's own main, which keeps its implicit "return 0". A non-zero return ends the
+// process with that status, as it would without the harness.
+// Build: g++ main.cpp phase_harness.cpp -Wl,--wrap=main (done by energy_service; GNU ld)
+
+#include <cstdio>
+#include <cstdlib>
+#include <ctime>
+#include <iostream>
+
+extern "C" int __real_main(int argc, char** argv);
+
+static long long to_ns(const timespec& ts) { return ts.tv_sec * 1000000000LL + ts.tv_nsec; }
+
+static void mark(FILE* markers, const char* label, int iteration) {
+    timespec wall, cpu;
+    clock_gettime(CLOCK_REALTIME, &wall);
+    clock_gettime(CLOCK_PROCESS_CPUTIME_ID, &cpu);
+    if (iteration > 0) {
+        std::fprintf(markers, "%s %d %lld %lld\n", label, iteration, to_ns(wall), to_ns(cpu));
+    } else {
+        std::fprintf(markers, "%s %lld %lld\n", label, to_ns(wall), to_ns(cpu));
+    }
+    std::fflush(markers);
+}
+
+extern "C" int __wrap_main(int argc, char** argv) {
+    FILE* markers = std::fopen(std::getenv("PHASE_MARKER_FILE"), "w");
+    int iterations = std::atoi(std::getenv("PHASE_ITERATIONS"));
+    long long budget_ns = std::atoll(std::getenv("PHASE_BUDGET_MS")) * 1000000LL;
+    const char* stdin_file = std::getenv("PHASE_STDIN_FILE");
+
+    mark(markers, "ready", 0);
+    timespec start;
+    clock_gettime(CLOCK_MONOTONIC, &start);
+
+    for (int i = 1; i <= iterations; i++) {
+        if (i > 1) {
+            std::freopen(stdin_file, "r", stdin);
+            std::cin.clear();
+        }
+        int status = __real_main(argc, argv);
+        if (status != 0) {
+            std::fclose(markers);
+            return status;
+        }
+        if (i == 1) {
+            std::cout.flush();
+            std::fflush(stdout);
+            std::freopen("/dev/null", "w", stdout);
+        }
+        mark(markers, "iter", i);
+
+        timespec now;
+        clock_gettime(CLOCK_MONOTONIC, &now);
+        if (to_ns(now) - to_ns(start) > budget_ns) {
+            break;
+        }
+    }
+    std::fclose(markers);
+    return 0;
+}
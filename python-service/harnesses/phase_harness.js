@@ -0,0 +1,42 @@
+// python-service/harnesses/phase_harness.js
+// Runs a JavaScript program repeatedly in one Node process and records phase markers.
+// "ready" once Node is up and the program is compiled, "iter N" after each run.
+// Only the first run's stdout is kept; timers/promises the program schedules are not timed.
+// Usage: node phase_harness.js program.js  (PHASE_* variables set by energy_service)
+
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const program = path.resolve(process.argv[2]);
+const iterations = parseInt(process.env.PHASE_ITERATIONS, 10);
+const budgetMs = parseInt(process.env.PHASE_BUDGET_MS, 10);
+const markerFd = fs.openSync(process.env.PHASE_MARKER_FILE, "w");
+
+const wallNs = () => BigInt(Math.round((performance.timeOrigin + performance.now()) * 1e6));
+const cpuNs = () => {
+  const usage = process.cpuUsage();
+  return BigInt(usage.user + usage.system) * 1000n;
+};
+const mark = (label) => fs.writeSync(markerFd, `${label} ${wallNs()} ${cpuNs()}\n`);
+
+// Same wrapper Node uses for CommonJS modules
+const source = fs.readFileSync(program, "utf8");
+const run = new vm.Script(
+  `(function (exports, require, module, __filename, __dirname) {${source}\n})`,
+  { filename: program }
+).runInThisContext();
+
+mark("ready");
+const first = performance.now();
+for (let i = 1; i <= iterations; i++) {
+  const module = { exports: {} };
+  run(module.exports, require, module, program, path.dirname(program));
+  if (i === 1) {
+    process.stdout.write = () => true;
+  }
+  mark(`iter ${i}`);
+  if (performance.now() - first > budgetMs) {
+    break;
+  }
+}
@@ -0,0 +1,48 @@
+# python-service/harnesses/phase_harness.py
+"""
+Runs a Python program repeatedly in one interpreter and records phase markers
+- "ready" once the interpreter is up and the program is compiled
+- "iter N" after each run; only the first run's stdout is kept
+
+Usage: python phase_harness.py program.py  (PHASE_* variables set by energy_service)
+"""
+
+import os
+import sys
+import time
+
+def mark(markers, label):
+    markers.write(f"{label} {time.time_ns()} {time.process_time_ns()}\n")
+    markers.flush()
+
+def main():
+    program = sys.argv[1]
+    iterations = int(os.environ['PHASE_ITERATIONS'])
+    budget_ns = int(os.environ['PHASE_BUDGET_MS']) * 1_000_000
+    stdin_file = os.environ['PHASE_STDIN_FILE']
+    
+    with open(program) as f:
+        code = compile(f.read(), program, 'exec')
+    
+    with open(os.environ['PHASE_MARKER_FILE'], 'w') as markers:
+        mark(markers, "ready")
+        first = time.perf_counter_ns()
+        for i in range(1, iterations + 1):
+            if i > 1:
+                # Each run re-reads the input; drop the previous run's stream first
+                sys.stdin.close()
+                sys.stdin = open(stdin_file)
+            try:
+                exec(code, {'__name__': '__main__', '__file__': program})
+            except SystemExit as e:
+                if e.code not in (None, 0):
+                    raise
+            if i == 1:
+                sys.stdout.flush()
+                sys.stdout = open(os.devnull, 'w')
+            mark(markers, f"iter {i}")
+            if time.perf_counter_ns() - first > budget_ns:
+                break
+
+if __name__ == '__main__':
+    main()
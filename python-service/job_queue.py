@@ -0,0 +1,301 @@
+# python-service/job_queue.py
+"""
+Job queue shared by the API front end and measurement workers
+- Front end enqueues measure/compare/matrix jobs and collects results
+- Workers register their language toolchains and capacity, then claim matching jobs
+- Jobs held by a worker that stops heartbeating are retried on another worker
+"""
+
+from abc import ABC, abstractmethod
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+
+JOB_QUEUE_BACKEND = os.environ.get('JOB_QUEUE_BACKEND', 'sqlite')
+JOB_QUEUE_PATH = os.environ.get(
+    'JOB_QUEUE_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'jobs.sqlite3')
+)
+
+# A worker that has not heartbeated for this long is considered dead (seconds)
+WORKER_TIMEOUT = float(os.environ.get('WORKER_TIMEOUT', '10'))
+HEARTBEAT_INTERVAL = 2.0
+MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', '3'))
+
+# How long the front end waits for a result; compare/matrix jobs can run for minutes
+JOB_WAIT_TIMEOUT = float(os.environ.get('JOB_WAIT_TIMEOUT', '900'))
+POLL_INTERVAL = 0.05
+
+# Jobs nobody collected by then (e.g. the front end crashed) are deleted (seconds after enqueue)
+JOB_RETENTION = float(os.environ.get('JOB_RETENTION', str(JOB_WAIT_TIMEOUT + 60)))
+
+class JobQueue(ABC):
+    """Interface every queue backend implements"""
+    
+    @abstractmethod
+    def enqueue(self, kind, language, payload, max_attempts=MAX_ATTEMPTS):
+        """Queue a job; returns its id"""
+    
+    @abstractmethod
+    def status(self, job_id):
+        """Job row as a dict (status, result, error, ...) or None"""
+    
+    @abstractmethod
+    def collect(self, job_id):
+        """Return (result, error) for a finished job and forget it, or None if still pending"""
+    
+    @abstractmethod
+    def cancel(self, job_id):
+        """Drop a job the front end no longer waits for"""
+    
+    @abstractmethod
+    def register_worker(self, worker_id, languages, capacity):
+        """Announce a worker with the languages it serves and its capacity"""
+    
+    @abstractmethod
+    def heartbeat(self, worker_id, active):
+        """Refresh a worker's liveness; False if it was already declared dead"""
+    
+    @abstractmethod
+    def unregister_worker(self, worker_id):
+        """Remove a worker and requeue any jobs it still held"""
+    
+    @abstractmethod
+    def claim(self, worker_id, languages):
+        """Atomically take the oldest queued job for one of `languages`, or None"""
+    
+    @abstractmethod
+    def complete(self, job_id, worker_id, result, error):
+        """Store a job's outcome, unless it was already handed to another worker"""
+    
+    @abstractmethod
+    def workers(self):
+        """Live workers with their languages, capacity and active job count"""
+    
+    def has_worker_for(self, language):
+        return any(language in worker["languages"] for worker in self.workers())
+    
+    def wait(self, job_id, timeout=JOB_WAIT_TIMEOUT):
+        """Block until a job finishes; returns (result, error)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            outcome = self.collect(job_id)
+            if outcome is not None:
+                return outcome
+            time.sleep(POLL_INTERVAL)
+        self.cancel(job_id)
+        return None, f"Timed out waiting for a worker ({int(timeout)}s limit)"
+    
+    def submit(self, kind, language, payload, timeout=JOB_WAIT_TIMEOUT):
+        """Enqueue a job and wait for its result; returns (result, error)"""
+        if not self.has_worker_for(language):
+            return None, f"No measurement worker available for language: {language}"
+        return self.wait(self.enqueue(kind, language, payload), timeout)
+
+class SQLiteJobQueue(JobQueue):
+    """Single-host backend: one SQLite file shared by the front end and all workers"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            language TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            worker_id TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, language, created_at);
+        CREATE TABLE IF NOT EXISTS workers (
+            id TEXT PRIMARY KEY,
+            host TEXT NOT NULL,
+            pid INTEGER NOT NULL,
+            languages TEXT NOT NULL,
+            capacity INTEGER NOT NULL,
+            active INTEGER NOT NULL DEFAULT 0,
+            started_at REAL NOT NULL,
+            heartbeat_at REAL NOT NULL
+        );
+    """
+    
+    def __init__(self, path=JOB_QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.SCHEMA)
+    
+    def _connect(self):
+        # A connection per call keeps this safe across threads and processes
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Transaction(conn)
+    
+    def enqueue(self, kind, language, payload, max_attempts=MAX_ATTEMPTS):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, language, payload, status, max_attempts, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, kind, language, json.dumps(payload), max_attempts, time.time())
+            )
+        return job_id
+    
+    def status(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def collect(self, job_id):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Sweep first so a job whose last worker died is reported failed right away
+            self._requeue_orphans(conn)
+            row = conn.execute(
+                "SELECT status, result, error FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None, "Job not found"
+            if row["status"] not in ('done', 'failed'):
+                return None
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        result = json.loads(row["result"]) if row["result"] else None
+        return result, row["error"]
+    
+    def cancel(self, job_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+    
+    def register_worker(self, worker_id, languages, capacity):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO workers (id, host, pid, languages, capacity, active, started_at, heartbeat_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (worker_id, socket.gethostname(), os.getpid(), json.dumps(sorted(languages)), capacity, now, now)
+            )
+    
+    def heartbeat(self, worker_id, active):
+        with self._connect() as conn:
+            updated = conn.execute("UPDATE workers SET heartbeat_at = ?, active = ? WHERE id = ?",
+                                   (time.time(), active, worker_id)).rowcount
+        return updated > 0
+    
+    def unregister_worker(self, worker_id):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+            self._requeue_orphans(conn)
+    
+    def claim(self, worker_id, languages):
+        if not languages:
+            return None
+        placeholders = ', '.join('?' for _ in languages)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            self._requeue_orphans(conn)
+            self._purge_expired(conn)
+            row = conn.execute(
+                f"SELECT id, kind, language, payload, attempts FROM jobs "
+                f"WHERE status = 'queued' AND language IN ({placeholders}) "
+                f"ORDER BY created_at LIMIT 1",
+                list(languages)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker_id = ?, attempts = attempts + 1, started_at = ? "
+                "WHERE id = ?",
+                (worker_id, time.time(), row["id"])
+            )
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "language": row["language"],
+            "payload": json.loads(row["payload"]),
+            "attempt": row["attempts"] + 1
+        }
+    
+    def complete(self, job_id, worker_id, result, error):
+        with self._connect() as conn:
+            # Ignore late results for a job that was already handed to another worker
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                ('failed' if error else 'done', json.dumps(result) if result is not None else None,
+                 error, time.time(), job_id, worker_id)
+            )
+    
+    def workers(self):
+        cutoff = time.time() - WORKER_TIMEOUT
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM workers WHERE heartbeat_at >= ? ORDER BY started_at",
+                                (cutoff,)).fetchall()
+        return [{
+            "id": row["id"],
+            "host": row["host"],
+            "pid": row["pid"],
+            "languages": json.loads(row["languages"]),
+            "capacity": row["capacity"],
+            "active": row["active"],
+            "heartbeat_age": round(time.time() - row["heartbeat_at"], 2)
+        } for row in rows]
+    
+    def _requeue_orphans(self, conn):
+        """Retry running jobs whose worker is gone; fail them after max_attempts"""
+        cutoff = time.time() - WORKER_TIMEOUT
+        conn.execute("DELETE FROM workers WHERE heartbeat_at < ?", (cutoff,))
+        orphaned = "status = 'running' AND worker_id NOT IN (SELECT id FROM workers)"
+        conn.execute(
+            f"UPDATE jobs SET status = 'failed', finished_at = ?, "
+            f"error = 'Measurement worker died (gave up after ' || attempts || ' attempts)' "
+            f"WHERE {orphaned} AND attempts >= max_attempts",
+            (time.time(),)
+        )
+        conn.execute(f"UPDATE jobs SET status = 'queued', worker_id = NULL WHERE {orphaned}")
+
+    def _purge_expired(self, conn):
+        """Delete finished or still-queued jobs past JOB_RETENTION; nobody will collect them"""
+        conn.execute("DELETE FROM jobs WHERE status != 'running' AND created_at < ?",
+                     (time.time() - JOB_RETENTION,))
+
+class _Transaction:
+    """Context manager: commit on success, roll back on error, always close"""
+    
+    def __init__(self, conn):
+        self.conn = conn
+    
+    def __enter__(self):
+        return self.conn
+    
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.conn.close()
+        return False
+
+QUEUE_BACKENDS = {
+    'sqlite': SQLiteJobQueue,
+}
+
+_queue = None
+
+def get_job_queue():
+    """Process-wide queue for the configured backend (JOB_QUEUE_BACKEND)"""
+    global _queue
+    if _queue is None:
+        if JOB_QUEUE_BACKEND not in QUEUE_BACKENDS:
+            raise ValueError(f"Unknown job queue backend: {JOB_QUEUE_BACKEND} "
+                             f"(available: {', '.join(QUEUE_BACKENDS)})")
+        _queue = QUEUE_BACKENDS[JOB_QUEUE_BACKEND]()
+    return _queue
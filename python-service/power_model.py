@@ -0,0 +1,354 @@
+# python-service/power_model.py
+"""
+Per-host power model used by estimate_energy_from_metrics
+- Fitted once from CPU and resident-memory microbenchmarks and Intel RAPL counters
+- Falls back to a configured TDP table keyed by CPU model, then to fixed defaults
+- Cached on disk together with the host fingerprint
+"""
+
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import psutil
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Defaults match the original fixed estimate: 65 W per busy core, 3 W per 8 GB of RAM
+DEFAULT_CPU_WATTS = 65.0
+DEFAULT_RAM_WATTS_PER_GB = 3.0 / 8.0
+DEFAULT_GRID_KG_PER_KWH = 0.475
+
+# Bumped whenever the fit changes, so stale cached models are rebuilt
+MODEL_VERSION = 3
+CACHE_PATH = os.environ.get(
+    'POWER_MODEL_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'power_model.json')
+)
+TDP_TABLE_PATH = os.environ.get('POWER_MODEL_TDP_TABLE', '')
+SKIP_CALIBRATION = os.environ.get('POWER_MODEL_SKIP_CALIBRATION', '') == '1'
+
+RAPL_ROOT = '/sys/class/powercap'
+BENCH_SECONDS = 1.0
+
+# The busy loop runs in child processes so the service's own work isn't measured
+CPU_BENCH = "import time\nend = time.time() + {seconds}\nx = 0\nwhile time.time() < end:\n    x += 1\n"
+# Touches every page of a buffer so it is resident, then holds it idle until killed
+MEMORY_BENCH = ("import time\nbuf = bytearray({size_mb} * 1024 * 1024)\n"
+                "for i in range(0, len(buf), 4096):\n    buf[i] = 1\n"
+                "print('ready', flush=True)\ntime.sleep(3600)\n")
+# Buffer sizes held during the DRAM fit; sizes above a quarter of available memory are skipped
+MEMORY_BENCH_MB = (256, 512, 1024)
+
+_model = None
+_model_lock = threading.Lock()
+
+def grid_intensity():
+    """Grid carbon intensity in kg CO2 per kWh (GRID_CARBON_INTENSITY env var)"""
+    try:
+        return float(os.environ.get('GRID_CARBON_INTENSITY', DEFAULT_GRID_KG_PER_KWH))
+    except ValueError:
+        return DEFAULT_GRID_KG_PER_KWH
+
+def cpu_model_name():
+    """Best-effort CPU model string"""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.lower().startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    if platform.system() == 'Darwin':
+        try:
+            return subprocess.run(['sysctl', '-n', 'machdep.cpu.brand_string'],
+                                  capture_output=True, text=True, timeout=2).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return platform.processor() or platform.machine()
+
+def host_fingerprint():
+    """Identify the host hardware so a cached model is only reused on the same machine"""
+    parts = {
+        "node": platform.node(),
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu_model": cpu_model_name(),
+        "logical_cpus": psutil.cpu_count(logical=True),
+        "memory_gb": round(psutil.virtual_memory().total / 1024 ** 3)
+    }
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()[:16]
+    return digest, parts
+
+def load_tdp_table():
+    """TDP table {cpu model substring: watts} from POWER_MODEL_TDP_TABLE"""
+    if not TDP_TABLE_PATH:
+        return {}
+    try:
+        with open(TDP_TABLE_PATH) as f:
+            return {str(k).lower(): float(v) for k, v in json.load(f).items()}
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"⚠️  Could not read TDP table {TDP_TABLE_PATH}: {e}")
+        return {}
+
+def lookup_tdp(cpu_model, table):
+    """Longest table key contained in the CPU model name wins"""
+    matches = [key for key in table if key in cpu_model.lower()]
+    return table[max(matches, key=len)] if matches else None
+
+def rapl_domains():
+    """Readable RAPL package and DRAM counters: {'package': [...], 'dram': [...]}"""
+    domains = {"package": [], "dram": []}
+    if not os.path.isdir(RAPL_ROOT):
+        return domains
+    for entry in sorted(os.listdir(RAPL_ROOT)):
+        path = os.path.join(RAPL_ROOT, entry)
+        try:
+            with open(os.path.join(path, 'name')) as f:
+                name = f.read().strip()
+            with open(os.path.join(path, 'energy_uj')) as f:
+                f.read()
+            with open(os.path.join(path, 'max_energy_range_uj')) as f:
+                max_range = int(f.read().strip())
+        except (OSError, ValueError):
+            continue
+        if name.startswith('package'):
+            domains["package"].append((path, max_range))
+        elif name == 'dram':
+            domains["dram"].append((path, max_range))
+    return domains
+
+def read_rapl(zones):
+    """Current energy counters (microjoules) for the given zones"""
+    readings = []
+    for path, _ in zones:
+        with open(os.path.join(path, 'energy_uj')) as f:
+            readings.append(int(f.read().strip()))
+    return readings
+
+def rapl_watts(zones, before, after, seconds):
+    """Average power between two readings, handling counter wrap-around"""
+    total_uj = 0
+    for (_, max_range), start, end in zip(zones, before, after):
+        total_uj += end - start if end >= start else end + max_range - start
+    return total_uj / 1e6 / seconds
+
+def run_bench(domains, source, processes):
+    """Run `processes` copies of a benchmark; returns (package W, dram W, total CPU %)"""
+    zones = domains["package"] + domains["dram"]
+    before = read_rapl(zones)
+    start = time.time()
+    children = [subprocess.Popen([sys.executable, '-c', source]) for _ in range(processes)]
+    ps_children = [psutil.Process(child.pid) for child in children]
+    cpu_seconds = 0.0
+    for child, ps_child in zip(children, ps_children):
+        try:
+            times = ps_child.cpu_times()
+            while child.poll() is None:
+                times = ps_child.cpu_times()
+                time.sleep(0.05)
+            cpu_seconds += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+        child.wait()
+    elapsed = time.time() - start
+    after = read_rapl(zones)
+    
+    n_pkg = len(domains["package"])
+    package_w = rapl_watts(domains["package"], before[:n_pkg], after[:n_pkg], elapsed)
+    dram_w = rapl_watts(domains["dram"], before[n_pkg:], after[n_pkg:], elapsed) if domains["dram"] else None
+    return package_w, dram_w, cpu_seconds / elapsed * 100
+
+def run_memory_bench(domains, size_mb):
+    """Hold a resident buffer of `size_mb`; returns (resident GB, dram W) while it is held"""
+    child = subprocess.Popen([sys.executable, '-c', MEMORY_BENCH.format(size_mb=size_mb)],
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        if child.stdout.readline().strip() != 'ready':
+            return None
+        resident_gb = psutil.Process(child.pid).memory_info().rss / 1024 ** 3
+        before = read_rapl(domains["dram"])
+        time.sleep(BENCH_SECONDS)
+        after = read_rapl(domains["dram"])
+        return resident_gb, rapl_watts(domains["dram"], before, after, BENCH_SECONDS)
+    finally:
+        child.kill()
+        child.wait()
+        child.stdout.close()
+
+def idle_power(domains):
+    """Baseline package/DRAM power with nothing extra running"""
+    zones = domains["package"] + domains["dram"]
+    before = read_rapl(zones)
+    time.sleep(BENCH_SECONDS / 2)
+    after = read_rapl(zones)
+    n_pkg = len(domains["package"])
+    package_w = rapl_watts(domains["package"], before[:n_pkg], after[:n_pkg], BENCH_SECONDS / 2)
+    dram_w = rapl_watts(domains["dram"], before[n_pkg:], after[n_pkg:], BENCH_SECONDS / 2) if domains["dram"] else None
+    return package_w, dram_w
+
+def fit_slope(points):
+    """Least-squares slope of (x, y) points"""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+def plausible_ram_watts(watts_per_gb):
+    return watts_per_gb is not None and DEFAULT_RAM_WATTS_PER_GB / 10 < watts_per_gb < DEFAULT_RAM_WATTS_PER_GB * 10
+
+def fit_ram_watts(domains, idle_dram):
+    """Watts per resident GB; returns (watts, how it was obtained)"""
+    if idle_dram is None:
+        return DEFAULT_RAM_WATTS_PER_GB, "default"
+    
+    # RSS is charged for as long as it is resident, so regress DRAM power against
+    # buffers held idle rather than against streaming bandwidth
+    available_mb = psutil.virtual_memory().available / 1024 ** 2
+    points = [(0.0, idle_dram)]
+    for size_mb in MEMORY_BENCH_MB:
+        if size_mb <= available_mb / 4:
+            point = run_memory_bench(domains, size_mb)
+            if point:
+                points.append(point)
+    if len(points) >= 3:
+        fitted = fit_slope(points)
+        if plausible_ram_watts(fitted):
+            return fitted, "resident-fit"
+    
+    # Refresh power barely depends on what is allocated on many hosts; then fall back
+    # to the idle DRAM power spread over installed memory
+    fitted = idle_dram / (psutil.virtual_memory().total / 1024 ** 3)
+    if plausible_ram_watts(fitted):
+        return fitted, "idle-per-installed-gb"
+    return DEFAULT_RAM_WATTS_PER_GB, "default"
+
+def calibrate_with_rapl(domains):
+    """Fit watts per busy core and watts per resident GB of DRAM from microbenchmarks"""
+    idle_pkg, idle_dram = idle_power(domains)
+    logical_cpus = psutil.cpu_count(logical=True) or 1
+    levels = sorted({1, max(1, logical_cpus // 2), logical_cpus})
+    
+    points = [(0.0, idle_pkg)]
+    for processes in levels:
+        package_w, _, cpu_pct = run_bench(domains, CPU_BENCH.format(seconds=BENCH_SECONDS), processes)
+        points.append((cpu_pct / 100.0, package_w))
+    cpu_watts = fit_slope(points)
+    if cpu_watts is None or not 0 < cpu_watts < 500:
+        return None
+    
+    ram_watts_per_gb, ram_source = fit_ram_watts(domains, idle_dram)
+    
+    return {
+        "cpu_watts": round(cpu_watts, 3),
+        "ram_watts_per_gb": round(ram_watts_per_gb, 4),
+        "ram_source": ram_source,
+        "idle_watts": round(idle_pkg, 3),
+        "samples": [[round(x, 3), round(y, 3)] for x, y in points]
+    }
+
+def calibrate(fingerprint, parts):
+    """Build a power model for this host: RAPL fit, then TDP table, then defaults"""
+    model = {
+        "version": MODEL_VERSION,
+        "fingerprint": fingerprint,
+        "host": parts,
+        "calibrated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "cpu_watts": DEFAULT_CPU_WATTS,
+        "ram_watts_per_gb": DEFAULT_RAM_WATTS_PER_GB,
+        "source": "default"
+    }
+    
+    domains = rapl_domains()
+    if domains["package"] and not SKIP_CALIBRATION:
+        print("🔧 Calibrating power model with RAPL microbenchmarks...")
+        try:
+            fitted = calibrate_with_rapl(domains)
+        except (OSError, psutil.Error, subprocess.SubprocessError) as e:
+            print(f"⚠️  RAPL calibration failed: {e}")
+            fitted = None
+        if fitted:
+            model.update(fitted)
+            model["source"] = "rapl"
+            return model
+    
+    tdp = lookup_tdp(parts["cpu_model"], load_tdp_table())
+    if tdp:
+        # psutil reports 100% per busy logical CPU, so spread TDP over all of them
+        model["cpu_watts"] = round(tdp / (parts["logical_cpus"] or 1), 3)
+        model["tdp_watts"] = tdp
+        model["source"] = "tdp-table"
+    return model
+
+def read_cache(fingerprint):
+    try:
+        with open(CACHE_PATH) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("fingerprint") == fingerprint and cached.get("version") == MODEL_VERSION:
+        return cached
+    return None
+
+def load_or_calibrate():
+    """Cached model for this host, calibrating (once, across worker processes) if needed"""
+    fingerprint, parts = host_fingerprint()
+    cached = read_cache(fingerprint)
+    if cached:
+        return cached
+    
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    with open(CACHE_PATH + '.lock', 'w') as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            # Another worker may have finished calibrating while we waited
+            cached = read_cache(fingerprint)
+            if cached:
+                return cached
+            model = calibrate(fingerprint, parts)
+            tmp_path = CACHE_PATH + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(model, f, indent=2)
+            os.replace(tmp_path, CACHE_PATH)
+            print(f"✅ Power model ready ({model['source']}): "
+                  f"{model['cpu_watts']} W/core, {model['ram_watts_per_gb']} W/GB")
+            return model
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def get_power_model():
+    """Process-wide power model; only the first call does any work"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                try:
+                    _model = load_or_calibrate()
+                except OSError as e:
+                    print(f"⚠️  Power model cache unavailable, using defaults: {e}")
+                    fingerprint, parts = host_fingerprint()
+                    _model = calibrate(fingerprint, parts)
+    return _model
+
+def describe_power_model():
+    """Summary of the active power model for /health"""
+    model = get_power_model()
+    return {
+        "source": model["source"],
+        "fingerprint": model["fingerprint"],
+        "cpu_watts": model["cpu_watts"],
+        "ram_watts_per_gb": model["ram_watts_per_gb"],
+        "grid_kg_per_kwh": grid_intensity()
+    }
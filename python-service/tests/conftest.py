@@ -0,0 +1,6 @@
+# python-service/tests/conftest.py
+import os
+import sys
+
+# Service modules are imported by name, as when running from python-service/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,32 @@
+# python-service/tests/test_benchmarks.py
+from benchmarks.run import baseline_mismatches, compare_with_baseline
+
+def scenario(rps, p95, error_rate=0.0):
+    return {"throughput_rps": rps, "error_rate": error_rate,
+            "latency_ms": {"p50": p95 / 2, "p95": p95, "p99": p95 * 1.2}}
+
+def test_baseline_from_another_setup_is_flagged():
+    baseline = {"mode": "client", "app": None, "concurrency": 4, "requests": 20}
+    current = {"mode": "server", "app": "asgi", "concurrency": 4, "requests": 20, "warmup": 1}
+    assert baseline_mismatches(current, baseline) == [
+        "mode: 'client' in baseline, 'server' now",
+        "app: None in baseline, 'asgi' now"
+    ]
+    # Settings the baseline did not record are not held against it
+    assert baseline_mismatches(dict(baseline, warmup=1), baseline) == []
+
+def test_regressions_use_threshold_and_error_rate():
+    baseline = {"scenarios": {
+        "slower": scenario(10.0, 100.0),
+        "steady": scenario(10.0, 100.0),
+        "flaky": scenario(10.0, 100.0)
+    }}
+    results = {"scenarios": {
+        "slower": scenario(8.0, 130.0),
+        "steady": scenario(9.5, 105.0),
+        "flaky": scenario(10.0, 100.0, error_rate=0.05),
+        "new": scenario(1.0, 1.0)
+    }}
+    rows, regressions = compare_with_baseline(results, baseline, threshold=10)
+    assert [row["scenario"] for row in rows] == ["slower", "steady", "flaky"]
+    assert regressions == ["slower", "flaky"]
@@ -0,0 +1,53 @@
+# python-service/tests/test_compare_stats.py
+import pytest
+
+import energy_service as core
+
+@pytest.mark.parametrize("alpha, df, expected", [
+    (0.05, 4, 2.776445),
+    (0.05, 10, 2.228139),
+    (0.01, 20, 2.845340),
+])
+def test_student_t_critical_matches_tables(alpha, df, expected):
+    assert core.student_t_critical(alpha, df) == pytest.approx(expected, abs=1e-4)
+
+def test_student_t_p_value_is_two_sided():
+    assert core.student_t_p_value(2.228139, 10) == pytest.approx(0.05, abs=1e-5)
+    assert core.student_t_p_value(-2.228139, 10) == pytest.approx(0.05, abs=1e-5)
+    assert core.student_t_p_value(0.0, 10) == pytest.approx(1.0)
+
+def test_paired_difference_detects_consistent_improvement():
+    baseline = [1.0, 1.2, 0.9, 1.1, 1.05]
+    candidate = [0.8, 1.0, 0.85, 0.9, 0.9]
+    stats = core.paired_difference_stats(baseline, candidate)
+    
+    assert stats["mean_delta"] == pytest.approx(-0.16)
+    assert stats["p_value"] < 0.01
+    assert stats["significant"]
+    low, high = stats["confidence_interval"]
+    assert low < stats["mean_delta"] < high < 0
+    assert core.comparison_verdict(stats) == "candidate_better"
+
+def test_paired_difference_noise_is_not_significant():
+    stats = core.paired_difference_stats([1.0, 1.1, 0.9, 1.0], [1.05, 1.0, 0.95, 1.02])
+    assert not stats["significant"]
+    assert core.comparison_verdict(stats) == "no_significant_difference"
+
+def test_constant_nonzero_delta_is_significant():
+    # Every round halves the energy; zero spread is not "no difference"
+    stats = core.paired_difference_stats([1.00, 1.01, 1.02], [0.50, 0.51, 0.52])
+    assert stats["p_value"] == 0.0
+    assert stats["significant"]
+    assert stats["confidence_interval"] == [stats["mean_delta"], stats["mean_delta"]]
+    assert core.comparison_verdict(stats) == "candidate_better"
+
+def test_identical_samples_are_no_difference():
+    stats = core.paired_difference_stats([0.0036, 0.0072, 0.0036], [0.0036, 0.0072, 0.0036])
+    assert stats["p_value"] == 1.0
+    assert not stats["significant"]
+    assert core.comparison_verdict(stats) == "no_significant_difference"
+
+def test_all_zero_samples_are_no_difference():
+    stats = core.paired_difference_stats([0.0, 0.0], [0.0, 0.0])
+    assert not stats["significant"]
+    assert stats["relative_change_pct"] is None
@@ -0,0 +1,106 @@
+# python-service/tests/test_job_queue.py
+import sqlite3
+import time
+
+import pytest
+
+import job_queue
+from job_queue import JobQueue, SQLiteJobQueue
+
+@pytest.fixture
+def queue(tmp_path):
+    return SQLiteJobQueue(str(tmp_path / 'jobs.sqlite3'))
+
+def execute(queue, sql, params=()):
+    conn = sqlite3.connect(queue.path)
+    with conn:
+        conn.execute(sql, params)
+    conn.close()
+
+def kill_worker(queue, worker_id):
+    """Make a worker look like it stopped heartbeating long ago"""
+    execute(queue, "UPDATE workers SET heartbeat_at = 0 WHERE id = ?", (worker_id,))
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        JobQueue()
+
+def test_claim_takes_oldest_job_for_supported_languages(queue):
+    queue.register_worker('w1', ['cpp', 'python'], 2)
+    java_job = queue.enqueue('measure', 'java', {"code": "a"})
+    first = queue.enqueue('measure', 'python', {"code": "b"})
+    second = queue.enqueue('measure', 'cpp', {"code": "c"})
+    
+    claimed = queue.claim('w1', ['cpp', 'python'])
+    assert claimed["id"] == first
+    assert claimed["payload"] == {"code": "b"}
+    assert claimed["attempt"] == 1
+    assert queue.claim('w1', ['cpp', 'python'])["id"] == second
+    assert queue.claim('w1', ['cpp', 'python']) is None
+    assert queue.status(java_job)["status"] == 'queued'
+
+def test_collect_returns_result_once(queue):
+    queue.register_worker('w1', ['python'], 1)
+    job_id = queue.enqueue('measure', 'python', {})
+    assert queue.collect(job_id) is None
+    
+    queue.claim('w1', ['python'])
+    queue.complete(job_id, 'w1', {"status": "success"}, None)
+    assert queue.collect(job_id) == ({"status": "success"}, None)
+    assert queue.collect(job_id) == (None, "Job not found")
+
+def test_jobs_of_a_dead_worker_are_requeued(queue):
+    queue.register_worker('w1', ['python'], 1)
+    queue.register_worker('w2', ['python'], 1)
+    job_id = queue.enqueue('measure', 'python', {})
+    assert queue.claim('w1', ['python'])["id"] == job_id
+    
+    kill_worker(queue, 'w1')
+    retried = queue.claim('w2', ['python'])
+    assert retried["id"] == job_id
+    assert retried["attempt"] == 2
+    
+    # The dead worker's late result is ignored; the live one's wins
+    queue.complete(job_id, 'w1', {"from": "w1"}, None)
+    queue.complete(job_id, 'w2', {"from": "w2"}, None)
+    assert queue.collect(job_id) == ({"from": "w2"}, None)
+    assert [worker["id"] for worker in queue.workers()] == ['w2']
+
+def test_job_fails_after_max_attempts(queue):
+    job_id = queue.enqueue('measure', 'python', {}, max_attempts=2)
+    for attempt, worker_id in enumerate(['w1', 'w2'], start=1):
+        queue.register_worker(worker_id, ['python'], 1)
+        assert queue.claim(worker_id, ['python'])["attempt"] == attempt
+        kill_worker(queue, worker_id)
+    
+    result, error = queue.collect(job_id)
+    assert result is None
+    assert error == "Measurement worker died (gave up after 2 attempts)"
+
+def test_unregister_requeues_held_jobs(queue):
+    queue.register_worker('w1', ['python'], 1)
+    job_id = queue.enqueue('measure', 'python', {})
+    queue.claim('w1', ['python'])
+    queue.unregister_worker('w1')
+    assert queue.status(job_id)["status"] == 'queued'
+
+def test_uncollected_jobs_are_purged(queue):
+    queue.register_worker('w1', ['python'], 1)
+    finished = queue.enqueue('measure', 'python', {})
+    queue.claim('w1', ['python'])
+    queue.complete(finished, 'w1', {}, None)
+    running = queue.enqueue('measure', 'python', {})
+    queue.claim('w1', ['python'])
+    abandoned = queue.enqueue('measure', 'cpp', {})
+    
+    expired = time.time() - job_queue.JOB_RETENTION - 1
+    execute(queue, "UPDATE jobs SET created_at = ?", (expired,))
+    queue.claim('w1', ['python'])
+    
+    assert queue.status(finished) is None
+    assert queue.status(abandoned) is None
+    assert queue.status(running)["status"] == 'running'
+
+def test_submit_without_worker_fails_fast(queue):
+    assert queue.submit('measure', 'java', {}) == (
+        None, "No measurement worker available for language: java")
@@ -0,0 +1,48 @@
+# python-service/tests/test_matrix_params.py
+import energy_service as core
+
+def test_presets_used_when_configurations_omitted():
+    configurations, error = core.validate_matrix_configurations('cpp', None)
+    assert error is None
+    assert configurations == core.MATRIX_PRESETS['cpp']
+
+def test_allowed_flags_are_accepted_and_named():
+    configurations, error = core.validate_matrix_configurations('cpp', [
+        {"name": "fast", "flags": ["-O3", "-march=native"]},
+        {"flags": ["-O2", "-flto"]},
+        {"flags": []}
+    ])
+    assert error is None
+    assert [config["name"] for config in configurations] == ["fast", "-O2 -flto", "default"]
+
+def test_java_flags_are_checked_against_the_java_allow_list():
+    configurations, error = core.validate_matrix_configurations('java', [
+        {"flags": ["-Xmx256m", "-XX:+UseSerialGC", "-XX:TieredStopAtLevel=1"]}
+    ])
+    assert error is None
+    _, error = core.validate_matrix_configurations('java', [{"flags": ["-O2"]}])
+    assert error == "Unsupported java flags: -O2"
+
+def test_unsafe_flags_are_rejected():
+    _, error = core.validate_matrix_configurations('cpp', [
+        {"flags": ["-O2", "-fplugin=evil.so", "-o/etc/passwd"]}
+    ])
+    assert error == "Unsupported cpp flags: -fplugin=evil.so, -o/etc/passwd"
+
+def test_malformed_configurations_are_rejected():
+    assert core.validate_matrix_configurations('cpp', [])[1] == "configurations must be a non-empty list"
+    assert core.validate_matrix_configurations('cpp', {"flags": []})[1] == "configurations must be a non-empty list"
+    assert core.validate_matrix_configurations('cpp', ["-O2"])[1] == "Each configuration needs a list of string flags"
+    assert core.validate_matrix_configurations('cpp', [{"flags": "-O2"}])[1] == "Each configuration needs a list of string flags"
+    too_many = [{"flags": ["-O2"]}] * (core.MATRIX_MAX_CONFIGURATIONS + 1)
+    assert "At most" in core.validate_matrix_configurations('cpp', too_many)[1]
+
+def test_parse_matrix_params():
+    params, error = core.parse_matrix_params({"language": "cpp", "code": "int main() {}", "repetitions": "2"})
+    assert error is None
+    assert params == ('cpp', 2, core.MATRIX_PRESETS['cpp'])
+    
+    assert core.parse_matrix_params({"language": "cpp"})[1] == "No code provided"
+    assert "not supported" in core.parse_matrix_params({"language": "python", "code": "x"})[1]
+    assert core.parse_matrix_params({"code": "x", "repetitions": "many"})[1] == "repetitions must be an integer"
+    assert "between 1 and" in core.parse_matrix_params({"code": "x", "repetitions": 0})[1]
@@ -0,0 +1,39 @@
+# python-service/tests/test_phases.py
+import pytest
+
+import energy_service as core
+
+def test_steady_state_starts_after_slow_warmup():
+    assert core.steady_state_start([50.0, 20.0, 10.5, 10.0, 10.2, 9.9]) == 2
+
+def test_steady_state_from_first_iteration_when_flat():
+    assert core.steady_state_start([10.0, 10.4, 9.8, 10.1]) == 0
+
+def test_steady_state_with_single_iteration():
+    assert core.steady_state_start([12.0]) == 0
+    assert core.steady_state_start([]) == 0
+
+def test_steady_state_tolerance_boundary():
+    # The tail median is 100, so anything up to 110 counts as steady
+    assert core.steady_state_start([111.0, 110.0, 100.0, 100.0]) == 1
+
+def test_parse_phase_markers(tmp_path):
+    markers = tmp_path / 'phases.log'
+    markers.write_text(
+        "ready 1000 200\n"
+        "iter 1 3000 1200\n"
+        "iter 2 4000 2100\n"
+        "garbage line\n"
+        "iter 3 5000\n"
+    )
+    ready, iterations = core.parse_phase_markers(str(markers))
+    assert ready == (1000, 200)
+    assert iterations == [(3000, 1200), (4000, 2100)]
+
+@pytest.mark.parametrize("content", [None, "", "iter 1 10 20\n", "ready x y\n"])
+def test_parse_phase_markers_without_ready(tmp_path, content):
+    markers = tmp_path / 'phases.log'
+    if content is not None:
+        markers.write_text(content)
+    ready, _ = core.parse_phase_markers(str(markers))
+    assert ready is None
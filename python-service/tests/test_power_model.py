@@ -0,0 +1,48 @@
+# python-service/tests/test_power_model.py
+from types import SimpleNamespace
+
+import pytest
+
+import power_model
+
+@pytest.fixture
+def fake_rapl(monkeypatch):
+    """RAPL readings for a host with 20 W per busy core, 10 W idle package and 32 GB of RAM"""
+    def set_dram(idle_watts, watts_per_resident_gb=0.0):
+        monkeypatch.setattr(power_model, 'idle_power', lambda domains: (10.0, idle_watts))
+        monkeypatch.setattr(power_model, 'run_memory_bench', lambda domains, size_mb: (
+            size_mb / 1024, idle_watts + watts_per_resident_gb * size_mb / 1024))
+    
+    def run_bench(domains, source, processes):
+        return 10.0 + 20.0 * processes, None, processes * 100.0
+    
+    monkeypatch.setattr(power_model, 'run_bench', run_bench)
+    monkeypatch.setattr(power_model.psutil, 'cpu_count', lambda logical=True: 8)
+    monkeypatch.setattr(power_model.psutil, 'virtual_memory',
+                        lambda: SimpleNamespace(total=32 * 1024 ** 3, available=16 * 1024 ** 3))
+    return set_dram
+
+def test_cpu_watts_is_the_fitted_slope(fake_rapl):
+    fake_rapl(None)
+    model = power_model.calibrate_with_rapl({"package": [], "dram": []})
+    assert model["cpu_watts"] == pytest.approx(20.0)
+    assert model["ram_watts_per_gb"] == power_model.DEFAULT_RAM_WATTS_PER_GB
+    assert model["ram_source"] == "default"
+
+def test_ram_watts_is_fitted_against_resident_buffers(fake_rapl):
+    fake_rapl(4.0, watts_per_resident_gb=0.5)
+    model = power_model.calibrate_with_rapl({"package": [], "dram": []})
+    assert model["ram_watts_per_gb"] == pytest.approx(0.5, abs=1e-4)
+    assert model["ram_source"] == "resident-fit"
+
+def test_flat_dram_power_falls_back_to_idle_per_installed_gb(fake_rapl):
+    fake_rapl(4.0)
+    model = power_model.calibrate_with_rapl({"package": [], "dram": []})
+    assert model["ram_watts_per_gb"] == pytest.approx(4.0 / 32, abs=1e-4)
+    assert model["ram_source"] == "idle-per-installed-gb"
+
+def test_implausible_dram_power_keeps_the_default(fake_rapl):
+    fake_rapl(400.0)
+    model = power_model.calibrate_with_rapl({"package": [], "dram": []})
+    assert model["ram_watts_per_gb"] == power_model.DEFAULT_RAM_WATTS_PER_GB
+    assert model["ram_source"] == "default"
@@ -0,0 +1,113 @@
+# python-service/worker.py
+"""
+Stateless measurement worker
+- Advertises the language toolchains found on this host and its capacity
+- Pulls measure/compare/matrix jobs from the job queue and runs them locally
+
+Usage: python worker.py [--capacity N] [--languages python,cpp]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import shutil
+import signal
+import socket
+import threading
+import time
+import traceback
+import uuid
+
+import energy_service as core
+from job_queue import HEARTBEAT_INTERVAL, get_job_queue
+
+# Executables each language needs on PATH (Python runs on this interpreter)
+TOOLCHAINS = {
+    'python': [],
+    'javascript': ['node'],
+    'cpp': ['g++'],
+    'java': ['javac', 'java'],
+}
+
+IDLE_POLL_INTERVAL = 0.1
+
+def detect_languages():
+    """Languages whose toolchain is installed on this host"""
+    return [language for language, tools in TOOLCHAINS.items()
+            if all(shutil.which(tool) for tool in tools)]
+
+class Worker:
+    def __init__(self, languages, capacity):
+        self.id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.languages = languages
+        self.capacity = capacity
+        self.queue = get_job_queue()
+        self.active = 0
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.drained = threading.Event()
+    
+    def run_job(self, job):
+        try:
+            result, error = core.execute_job(job["kind"], job["language"], job["payload"])
+        except Exception as e:
+            result, error = None, f"Worker error: {str(e)}\n{traceback.format_exc()}"
+        self.queue.complete(job["id"], self.id, result, error)
+        with self.lock:
+            self.active -= 1
+    
+    def heartbeat_loop(self):
+        # Keeps beating while in-flight jobs drain after stop()
+        while not self.drained.wait(HEARTBEAT_INTERVAL):
+            if not self.queue.heartbeat(self.id, self.active):
+                # Declared dead after a stall; its jobs were requeued, so rejoin fresh
+                self.queue.register_worker(self.id, self.languages, self.capacity)
+    
+    def serve(self):
+        core.get_power_model()
+        self.queue.register_worker(self.id, self.languages, self.capacity)
+        threading.Thread(target=self.heartbeat_loop, daemon=True).start()
+        print(f"👷 Worker {self.id} ready: {', '.join(self.languages)} (capacity {self.capacity})")
+        
+        with ThreadPoolExecutor(max_workers=self.capacity) as pool:
+            while not self.stopping.is_set():
+                if self.active >= self.capacity:
+                    time.sleep(IDLE_POLL_INTERVAL)
+                    continue
+                job = self.queue.claim(self.id, self.languages)
+                if job is None:
+                    time.sleep(IDLE_POLL_INTERVAL)
+                    continue
+                with self.lock:
+                    self.active += 1
+                pool.submit(self.run_job, job)
+        
+        self.drained.set()
+        self.queue.unregister_worker(self.id)
+        print(f"👋 Worker {self.id} stopped")
+    
+    def stop(self, *_):
+        # In-flight jobs finish; no new jobs are claimed
+        self.stopping.set()
+
+def main():
+    parser = argparse.ArgumentParser(description="Energy measurement worker")
+    parser.add_argument('--capacity', type=int, default=int(os.environ.get('WORKER_CAPACITY', os.cpu_count() or 1)),
+                        help="concurrent jobs (default: WORKER_CAPACITY or CPU count)")
+    parser.add_argument('--languages', default=os.environ.get('WORKER_LANGUAGES', ''),
+                        help="comma-separated languages to serve (default: every installed toolchain)")
+    args = parser.parse_args()
+    
+    available = detect_languages()
+    languages = [l.strip() for l in args.languages.split(',') if l.strip()] or available
+    missing = [l for l in languages if l not in available]
+    if missing:
+        parser.error(f"toolchain not installed for: {', '.join(missing)}")
+    
+    worker = Worker(languages, max(1, args.capacity))
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.serve()
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
 # python-service/wsgi.py
 from energy_service import app
+from power_model import get_power_model
+
+# Calibrate (or load the cached power model) before taking traffic
+get_power_model()
 
 if __name__ == "__main__":
     app.run()
\ No newline at end of file